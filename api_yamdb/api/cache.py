@@ -0,0 +1,223 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, DateTimeField, Max, Subquery
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework.response import Response
+
+from reviews.models import Tombstone
+
+# Last-Modified пустого списка без удалений: подходит любая постоянная
+# дата в прошлом, кроме нулевой - её Django не считает заголовком.
+EMPTY_LIST_MODIFIED = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+def get_api_cache():
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+def namespace_key(namespace):
+    return f'api:ns:{namespace}'
+
+
+def get_namespace_versions(namespaces):
+    """
+    Версия пространства имён - время последней записи в наносекундах,
+    поэтому она же служит отметкой Last-Modified. Для отсутствующей
+    версии берётся текущее время: оно не совпадёт ни с одной прежней.
+    """
+    cache = get_api_cache()
+    keys = [namespace_key(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_namespaces(*namespaces):
+    version = time.time_ns()
+    get_api_cache().set_many(
+        {namespace_key(namespace): version for namespace in namespaces},
+        timeout=None
+    )
+
+
+class NamespaceVersionMixin:
+    """
+    Вьюсет, ответы которого зависят от пространств имён из
+    get_cache_namespaces() и общего пространства catalogue; запись в
+    связанные модели обновляет их версии (см. api.signals).
+    """
+
+    def get_cache_namespaces(self, **kwargs):
+        return (self.basename,)
+
+    def get_namespace_versions(self, **kwargs):
+        if getattr(self, 'namespace_versions', None) is None:
+            self.namespace_versions = get_namespace_versions(
+                ('catalogue', *self.get_cache_namespaces(**kwargs))
+            )
+        return self.namespace_versions
+
+    def get_response_digest(self, request, **kwargs):
+        return hashlib.md5('|'.join((
+            request.build_absolute_uri(),
+            request.META.get('HTTP_ACCEPT', ''),
+            *map(str, self.get_namespace_versions(**kwargs)),
+        )).encode()).hexdigest()
+
+
+class ConditionalListMixin:
+    """
+    Отдаёт для списка ETag и Last-Modified, посчитанные по БД, и отвечает
+    304 на If-None-Match/If-Modified-Since. Условия проверяются после
+    проверки прав и поиска родительских объектов, но до выборки страницы
+    и сериализации.
+    """
+
+    # Поля, от которых зависит представление записи в списке.
+    list_updated_fields = ('updated_at',)
+
+    def get_list_validators(self, queryset):
+        """
+        Состояние списка для ETag и время для Last-Modified: число
+        записей и наибольшие updated_at выборки и связанных записей из
+        list_updated_fields, а также время последнего удаления записи
+        этой модели, которое по выборке не видно.
+        """
+        # Агрегат считается по первичным ключам выборки: её аннотации
+        # (например, ранг поиска) на состояние списка не влияют.
+        totals = queryset.model._default_manager.filter(
+            pk__in=queryset.order_by().values('pk')
+        ).aggregate(
+            count=Count('pk'),
+            **{
+                field: Max(field) for field in self.list_updated_fields
+            },
+            deleted=Max(Subquery(
+                Tombstone.objects.filter(
+                    model=queryset.model._meta.model_name
+                ).order_by('-deleted_at').values('deleted_at')[:1]
+            ), output_field=DateTimeField()),
+        )
+        updated = [totals[field] for field in self.list_updated_fields]
+        return (totals['count'], *updated), max(
+            (
+                value for value in (*updated, totals['deleted'])
+                if value is not None
+            ),
+            default=EMPTY_LIST_MODIFIED
+        )
+
+    def filter_queryset(self, queryset):
+        # Список фильтруется дважды: для условных заголовков и для
+        # страницы. Фильтры вроде поиска выполняют запросы сами, поэтому
+        # выборка запоминается до конца запроса.
+        if self.action != 'list':
+            return super().filter_queryset(queryset)
+        if getattr(self, 'filtered_queryset', None) is None:
+            self.filtered_queryset = super().filter_queryset(queryset)
+        return self.filtered_queryset
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            request,
+            self.get_list_validators(
+                self.filter_queryset(self.get_queryset())
+            ),
+            partial(super().list, request, *args, **kwargs)
+        )
+
+    def get_conditional_response(self, request, validators, respond):
+        if validators is None:
+            return respond()
+        state, last_modified = validators
+        etag = quote_etag(hashlib.md5('|'.join((
+            request.build_absolute_uri(),
+            request.META.get('HTTP_ACCEPT', ''),
+            *map(str, state),
+        )).encode()).hexdigest())
+        last_modified = int(last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = respond()
+        if response.status_code == 200:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class ConditionalGetMixin(ConditionalListMixin):
+    """То же для списка и отдельного объекта: его ETag - по updated_at."""
+
+    def get_object_validators(self, instance):
+        return (instance.pk, instance.updated_at), instance.updated_at
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return self.get_conditional_response(
+            request,
+            self.get_object_validators(instance),
+            lambda: Response(self.get_serializer(instance).data)
+        )
+
+
+class AnonymousResponseCacheMixin(NamespaceVersionMixin):
+    """
+    Кеширует ответы на GET-запросы без заголовка Authorization вместе с
+    ETag и Last-Modified, по которым отвечает 304 и из кеша.
+    """
+    CACHED_HEADERS = ('ETag', 'Last-Modified')
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or 'HTTP_AUTHORIZATION' in request.META:
+            return super().dispatch(request, *args, **kwargs)
+        cache = get_api_cache()
+        key = 'api:response:' + self.get_response_digest(request, **kwargs)
+        cached = cache.get(key)
+        if cached is not None:
+            return self.get_cached_response(request, *cached)
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            def store(rendered):
+                cache.set(
+                    key,
+                    (
+                        rendered.content,
+                        rendered['Content-Type'],
+                        {
+                            header: rendered[header]
+                            for header in self.CACHED_HEADERS
+                            if rendered.has_header(header)
+                        },
+                    ),
+                    getattr(settings, 'API_CACHE_TIMEOUT', 60)
+                )
+            response.add_post_render_callback(store)
+        return response
+
+    def get_cached_response(self, request, content, content_type, headers):
+        if headers:
+            response = get_conditional_response(
+                request,
+                etag=headers.get('ETag'),
+                last_modified=parse_http_date_safe(
+                    headers.get('Last-Modified', '')
+                )
+            )
+            if response is not None:
+                return response
+        response = HttpResponse(content, content_type=content_type)
+        for header, value in headers.items():
+            response[header] = value
+        return response
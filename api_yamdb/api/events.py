@@ -0,0 +1,273 @@
+import asyncio
+import io
+import re
+import threading
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import DisallowedHost
+from django.core.handlers.asgi import ASGIRequest
+from django.urls import get_resolver
+from django.utils.module_loading import import_string
+
+from api.renderers import FastJSONRenderer
+from reviews.models import Title
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(getattr(
+                settings, 'EVENTS_BROKER', 'api.events.InProcessBroker'
+            ))()
+        return _broker
+
+
+def title_channel(title_id):
+    return f'title:{title_id}'
+
+
+def encode_event(event_type, data):
+    return b'event: %s\ndata: %s\n\n' % (
+        event_type.encode('ascii'), FastJSONRenderer().render(data)
+    )
+
+
+def publish_title_event(title_id, event_type, get_data):
+    """
+    Рассылает подписчикам произведения событие в формате SSE. Данные
+    события get_data() собираются, только если подписчики есть.
+    """
+    broker = get_broker()
+    channel = title_channel(title_id)
+    if broker.has_subscribers(channel):
+        broker.publish(channel, encode_event(event_type, get_data()))
+
+
+class Subscription:
+    """
+    Очередь событий одного подключения. Пополняется из любого потока,
+    читается в цикле событий, в котором создана; после close() get()
+    возвращает None.
+    """
+    # Комментарий SSE: держит простаивающее соединение открытым в прокси.
+    PING = b': ping\n\n'
+
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.closed = False
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(getattr(settings, 'EVENTS_QUEUE_SIZE', 100))
+        self.keepalive_handle = None
+
+    def put(self, message):
+        try:
+            self.loop.call_soon_threadsafe(self.put_nowait, message)
+        except RuntimeError:
+            # Цикл событий уже закрыт, подключения больше нет.
+            self.close()
+
+    def put_nowait(self, message):
+        # Медленный клиент теряет старые события, а не копит их в памяти:
+        # пропущенное он может дочитать из ленты изменений.
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        message = await self.queue.get()
+        return None if self.closed else message
+
+    def keepalive(self, interval):
+        # Один таймер на подключение вместо ожидания с тайм-аутом на
+        # каждое событие.
+        self.keepalive_handle = self.loop.call_later(
+            interval, self.ping, interval
+        )
+
+    def ping(self, interval):
+        if self.queue.empty():
+            self.put_nowait(self.PING)
+        self.keepalive(interval)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.broker.unsubscribe(self)
+        if self.keepalive_handle is not None:
+            self.keepalive_handle.cancel()
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.put_nowait, None)
+
+
+class Broker(ABC):
+    """
+    Интерфейс брокера событий. publish() вызывается из обработчиков
+    сигналов в любом потоке, subscribe() - из цикла событий ASGI.
+    Для нескольких процессов брокер пересылает сообщения через внешнюю
+    шину (например, Redis pub/sub) и раздаёт их своим подписчикам.
+    """
+
+    @abstractmethod
+    def publish(self, channel, message):
+        """Отправляет сообщение всем подписчикам канала."""
+
+    def has_subscribers(self, channel):
+        # Подписчики внешней шины могут быть в других процессах.
+        return True
+
+    @abstractmethod
+    def subscribe(self, channel):
+        """Возвращает Subscription на канал."""
+
+    @abstractmethod
+    def unsubscribe(self, subscription):
+        """Отменяет подписку; вызывается из Subscription.close()."""
+
+
+class InProcessBroker(Broker):
+    """Брокер в памяти процесса: события видят подписчики этого процесса."""
+
+    def __init__(self):
+        self.channels = {}
+        self.lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self.lock:
+            subscriptions = list(self.channels.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.put(message)
+
+    def has_subscribers(self, channel):
+        return channel in self.channels
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self.lock:
+            self.channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.channels.get(subscription.channel)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self.channels[subscription.channel]
+
+
+async def send_json_error(send, status, detail):
+    body = FastJSONRenderer().render({'detail': detail})
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def title_events(scope, receive, send, title_id):
+    """
+    Поток SSE с новыми отзывами и комментариями произведения. Каждое
+    подключение - корутина с очередью, без отдельного потока.
+    """
+    if scope['method'] not in ('GET', 'HEAD'):
+        await send_json_error(send, 405, 'Метод не разрешён.')
+        return
+    exists = await sync_to_async(
+        Title.objects.filter(pk=title_id).exists
+    )()
+    if not exists:
+        await send_json_error(send, 404, 'Страница не найдена.')
+        return
+
+    subscription = get_broker().subscribe(title_channel(title_id))
+    watcher = asyncio.ensure_future(wait_for_disconnect(receive, subscription))
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        if scope['method'] == 'HEAD':
+            await send({'type': 'http.response.body'})
+            return
+        await send({
+            'type': 'http.response.body',
+            'body': b'retry: 3000\n\n',
+            'more_body': True,
+        })
+        subscription.keepalive(getattr(settings, 'EVENTS_HEARTBEAT', 15))
+        while True:
+            message = await subscription.get()
+            if message is None:
+                break
+            await send({
+                'type': 'http.response.body',
+                'body': message,
+                'more_body': True,
+            })
+    finally:
+        subscription.close()
+        watcher.cancel()
+
+
+async def wait_for_disconnect(receive, subscription):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+    subscription.close()
+
+
+@lru_cache(maxsize=None)
+def get_events_path():
+    # Префикс API берётся из URLconf, как для адресов самого Django.
+    titles = get_resolver().reverse('titles-list')
+    return re.compile(rf'^/{re.escape(titles)}(?P<title_id>\d+)/events/$')
+
+
+def get_path_info(scope):
+    # Как ASGIRequest: путь приложения без префикса root_path.
+    root_path = scope.get('root_path', '')
+    if root_path and scope['path'].startswith(root_path):
+        return scope['path'][len(root_path):]
+    return scope['path']
+
+
+class EventsRouter:
+    """
+    ASGI-приложение, которое отдаёт потоки событий само, а остальные
+    запросы передаёт Django: в Django 3.2 потоковый ответ читается
+    синхронно и занял бы цикл событий.
+    """
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            match = get_events_path().match(get_path_info(scope))
+            if match is not None:
+                try:
+                    # Та же проверка ALLOWED_HOSTS, что и в Django.
+                    ASGIRequest(scope, io.BytesIO()).get_host()
+                except DisallowedHost:
+                    return await send_json_error(
+                        send, 400, 'Недопустимый заголовок Host.'
+                    )
+                return await title_events(
+                    scope, receive, send, int(match['title_id'])
+                )
+        return await self.application(scope, receive, send)
@@ -1,25 +1,43 @@
 from django_filters import rest_framework as filters
+from rest_framework.filters import BaseFilterBackend
+
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitleFilter(filters.FilterSet):
     category = filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='icontains'
+        field_name='category__slug'
     )
     genre = filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains'
+        field_name='genre__slug'
     )
     name = filters.CharFilter(
         field_name='name',
         lookup_expr='icontains'
     )
     year = filters.NumberFilter(
+        field_name='year'
+    )
+    year_min = filters.NumberFilter(
         field_name='year',
-        lookup_expr='icontains'
+        lookup_expr='gte'
+    )
+    year_max = filters.NumberFilter(
+        field_name='year',
+        lookup_expr='lte'
     )
 
     class Meta:
         model = Title
-        fields = ('name', 'year', 'category', 'genre',)
+        fields = ('name', 'year', 'year_min', 'year_max', 'category', 'genre',)
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not query.strip():
+            return queryset
+        return search_titles(queryset, query)
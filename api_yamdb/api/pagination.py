@@ -0,0 +1,96 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class PubDateKeysetPagination(pagination.PageNumberPagination):
+    """
+    Постраничный вывод по номеру страницы либо, если в запросе есть
+    параметр cursor, по ключу (pub_date, id) без OFFSET и COUNT(*).
+    Первая страница в режиме курсора запрашивается с пустым ?cursor=.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+        if reverse:
+            queryset = queryset.order_by('pub_date', 'id')
+        else:
+            queryset = queryset.order_by('-pub_date', '-id')
+        if position is not None:
+            pub_date, pk = position
+            if reverse:
+                queryset = queryset.filter(
+                    Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, id__gt=pk)
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+                )
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        self.page = results[:page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        return self.page
+
+    def decode_cursor(self, request):
+        encoded = request.query_params[self.cursor_query_param]
+        if not encoded:
+            return None, False
+        try:
+            pub_date, pk, reverse = urlsafe_b64decode(
+                encoded.encode('ascii')
+            ).decode('ascii').split('|')
+            return (datetime.fromisoformat(pub_date), int(pk)), reverse == 'r'
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, obj, reverse):
+        token = '|'.join(
+            (obj.pub_date.isoformat(), str(obj.id), 'r' if reverse else '')
+        )
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            urlsafe_b64encode(token.encode('ascii')).decode('ascii')
+        )
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
@@ -28,5 +28,5 @@ class IsSuperUserOrAdminOrModerOrAuthorAndIsAuth(permissions.BasePermission):
                  or request.user.is_staff
                  or request.user.is_admin
                  or request.user.is_moderator
-                 or request.user == obj.author)
+                 or obj.author_id == request.user.id)
         )
@@ -0,0 +1,132 @@
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from reviews.models import Genre
+
+datetime_to_representation = serializers.DateTimeField().to_representation
+
+
+class ValuesProjection:
+    """
+    Представление строк списка без сериализатора: нужные колонки читаются
+    через values_list(), а словари ответа собираются напрямую. Результат
+    совпадает с выводом соответствующего сериализатора.
+    """
+    # Пары (ключ ответа, поле для values_list) в порядке полей сериализатора.
+    fields = ()
+    # Преобразования значений по ключу ответа.
+    converters = {}
+
+    def __init__(self):
+        self.keys = tuple(key for key, _ in self.fields)
+        self.lookups = tuple(lookup for _, lookup in self.fields)
+
+    def project(self, queryset):
+        return queryset.prefetch_related(None).values_list(
+            *self.lookups, named=True
+        )
+
+    def to_representation(self, rows):
+        keys = self.keys
+        converters = tuple(self.converters.items())
+        data = []
+        for row in rows:
+            item = dict(zip(keys, row))
+            for key, convert in converters:
+                item[key] = convert(item[key])
+            data.append(item)
+        return data
+
+
+class ReviewProjection(ValuesProjection):
+    fields = (
+        ('id', 'id'),
+        ('author', 'author__username'),
+        ('title', 'title_id'),
+        ('score', 'score'),
+        ('text', 'text'),
+        ('pub_date', 'pub_date'),
+    )
+    converters = {'pub_date': datetime_to_representation}
+
+
+class CommentProjection(ValuesProjection):
+    fields = (
+        ('id', 'id'),
+        ('author', 'author__username'),
+        ('review', 'review_id'),
+        ('text', 'text'),
+        ('pub_date', 'pub_date'),
+    )
+    converters = {'pub_date': datetime_to_representation}
+
+
+class SlugProjection(ValuesProjection):
+    """Жанр или категория вместе с первичным ключом."""
+    fields = (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('slug', 'slug'),
+    )
+
+
+class TitleProjection(ValuesProjection):
+    fields = (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('year', 'year'),
+        ('rating', 'rating'),
+        ('description', 'description'),
+        ('category_name', 'category__name'),
+        ('category_slug', 'category__slug'),
+    )
+
+    def to_representation(self, rows):
+        # Жанры страницы читаются тем же запросом, что и prefetch_related.
+        genres = {}
+        for title_id, name, slug in Genre.objects.filter(
+            title__in=[row.id for row in rows]
+        ).values_list('title', 'name', 'slug'):
+            genres.setdefault(title_id, []).append(
+                {'name': name, 'slug': slug}
+            )
+        data = []
+        for row in rows:
+            data.append({
+                'id': row.id,
+                'name': row.name,
+                'year': row.year,
+                'rating': row.rating,
+                'description': row.description,
+                'genre': genres.get(row.id, []),
+                'category': None if row.category__slug is None else {
+                    'name': row.category__name,
+                    'slug': row.category__slug,
+                },
+            })
+        return data
+
+
+class ProjectionListMixin:
+    """
+    Вьюсет, список которого отдаётся через list_projection, если
+    get_list_projection() не вернул None.
+    """
+    list_projection = None
+
+    def get_list_projection(self):
+        return self.list_projection
+
+    def list(self, request, *args, **kwargs):
+        projection = self.get_list_projection()
+        if projection is None:
+            return super().list(request, *args, **kwargs)
+        queryset = projection.project(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                projection.to_representation(page)
+            )
+        return Response(projection.to_representation(list(queryset)))
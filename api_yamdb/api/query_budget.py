@@ -0,0 +1,68 @@
+import logging
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    """execute_wrapper, запоминающий SQL всех выполненных запросов."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+
+class QueryBudgetMixin:
+    """
+    Ограничивает число SQL-запросов, которое может выполнить действие
+    вьюсета. Лимиты задаются в settings.QUERY_BUDGETS по ключу
+    '<basename>-<action>', запросы аутентификации не учитываются.
+    При settings.QUERY_BUDGET_MODE == 'raise' превышение лимита
+    приводит к QueryBudgetExceeded, при 'warn' - к записи в лог, без
+    режима запросы не отслеживаются.
+    """
+
+    def get_query_budget(self):
+        budgets = getattr(settings, 'QUERY_BUDGETS', {})
+        return budgets.get(f'{self.basename}-{self.action}')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.query_counter is not None:
+            self.query_budget_offset = len(self.query_counter.queries)
+
+    def dispatch(self, request, *args, **kwargs):
+        self.query_counter = None
+        self.query_budget_offset = None
+        if not getattr(settings, 'QUERY_BUDGET_MODE', None):
+            return super().dispatch(request, *args, **kwargs)
+        self.query_counter = QueryCounter()
+        with connection.execute_wrapper(self.query_counter):
+            response = super().dispatch(request, *args, **kwargs)
+        self.check_query_budget()
+        return response
+
+    def check_query_budget(self):
+        mode = getattr(settings, 'QUERY_BUDGET_MODE', None)
+        budget = self.get_query_budget()
+        if not mode or budget is None or self.query_budget_offset is None:
+            return
+        queries = self.query_counter.queries[self.query_budget_offset:]
+        if len(queries) <= budget:
+            return
+        message = (
+            f'{self.basename}-{self.action}: {len(queries)} queries '
+            f'exceed budget of {budget}:\n' + '\n'.join(queries)
+        )
+        if mode == 'raise':
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -1,8 +1,18 @@
 from rest_framework.validators import UniqueValidator
 from rest_framework import serializers
-from django.shortcuts import get_object_or_404
+from rest_framework.relations import MANY_RELATION_KWARGS
+from rest_framework.settings import api_settings
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed
+from django.utils.encoding import smart_str
 
-from reviews.models import Comment, Category, Genre, Review, Title
+from api.utils import get_expanded_fields
+from reviews.models import (Comment, Category, Genre, Review, Title,
+                            TitleGenre, TitleRanking, TitleStats)
+from reviews.signals import titles_bulk_saved, touch_titles
+from reviews.stats import SCORE_FIELDS
 from users.models import User
 
 FORBIDDEN_USERNAMES = [
@@ -26,18 +36,58 @@ class UserCreateSerializer(serializers.Serializer):
             raise serializers.ValidationError(
                 f'Использовать имя - {value} - запрещено!'
             )
-        if User.objects.filter(username=value).exists():
-            raise serializers.ValidationError(
-                f'Пользователь с таким username — {value} — уже существует!'
-            )
         return value
 
-    def validate_email(self, value):
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError(
-                f'Пользователь с таким email - {value} - уже существует!'
+    def get_conflicts(self, username, email):
+        """
+        Одним запросом по уникальным индексам username и email находит
+        пользователя с этой парой либо ошибки занятых полей.
+        """
+        users = User.objects.filter(
+            Q(username=username) | Q(email=email)
+        ).only('id', 'username', 'email', 'password', 'last_login')[:2]
+        errors = {}
+        for user in users:
+            if user.username == username and user.email == email:
+                return user, {}
+            if user.username == username:
+                errors['username'] = [
+                    f'Пользователь с таким username — {username} — '
+                    'уже существует!'
+                ]
+            if user.email == email:
+                errors['email'] = [
+                    f'Пользователь с таким email - {email} - уже существует!'
+                ]
+        return None, errors
+
+    def validate(self, data):
+        user, errors = self.get_conflicts(data['username'], data['email'])
+        if errors:
+            raise serializers.ValidationError(errors)
+        data['user'] = user
+        return data
+
+    def create(self, validated_data):
+        if validated_data['user'] is not None:
+            return validated_data['user']
+        try:
+            with transaction.atomic():
+                return User.objects.create(
+                    username=validated_data['username'],
+                    email=validated_data['email']
+                )
+        except IntegrityError:
+            # Пользователь зарегистрирован параллельным запросом: с той же
+            # парой ему, как и при повторной регистрации, высылается код.
+            user, errors = self.get_conflicts(
+                validated_data['username'], validated_data['email']
             )
-        return value
+            if user is not None:
+                return user
+            if not errors:
+                raise
+            raise serializers.ValidationError(errors)
 
 
 class UserReceiveTokenSerializer(serializers.Serializer):
@@ -89,12 +139,24 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
 
 
+class TitleStatsSerializer(serializers.ModelSerializer):
+    scores = serializers.SerializerMethodField()
+
+    class Meta:
+        fields = ('scores', 'review_count', 'comment_count', 'last_review_at')
+        model = TitleStats
+
+    def get_scores(self, obj):
+        return {
+            str(score): getattr(obj, field)
+            for score, field in enumerate(SCORE_FIELDS, 1)
+        }
+
+
 class TitleReadSerializer(serializers.ModelSerializer):
-    rating = serializers.IntegerField(
-        source='reviews__score__avg', read_only=True
-    )
     genre = GenreSerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True)
+    stats = TitleStatsSerializer(read_only=True)
 
     class Meta:
         fields = (
@@ -105,15 +167,100 @@ class TitleReadSerializer(serializers.ModelSerializer):
             'description',
             'genre',
             'category',
+            'stats',
         )
         model = Title
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if 'stats' not in get_expanded_fields(request):
+            self.fields.pop('stats')
+
+
+class TitleTopSerializer(TitleReadSerializer):
+    score = serializers.FloatField(source='ranking_score', read_only=True)
+
+    class Meta(TitleReadSerializer.Meta):
+        fields = TitleReadSerializer.Meta.fields + ('score',)
+
+
+class TitleTopQuerySerializer(serializers.Serializer):
+    category = serializers.SlugField(required=False)
+    genre = serializers.SlugField(required=False)
+    year = serializers.IntegerField(required=False)
+    limit = serializers.IntegerField(
+        required=False, default=10, min_value=1, max_value=100
+    )
+
+    def validate(self, data):
+        scopes = [
+            scope for scope in (TitleRanking.CATEGORY,
+                                TitleRanking.GENRE,
+                                TitleRanking.YEAR)
+            if scope in data
+        ]
+        if len(scopes) > 1:
+            raise serializers.ValidationError(
+                'Можно выбрать только один срез рейтинга!'
+            )
+        if scopes:
+            data['scope'] = scopes[0]
+            data['key'] = str(data[scopes[0]])
+        else:
+            data['scope'], data['key'] = TitleRanking.ALL, ''
+        return data
+
+
+class ManySlugRelatedField(serializers.ManyRelatedField):
+    """Список слагов, которые проверяются одним запросом к БД."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        child = self.child_relation
+        try:
+            objects = {
+                getattr(obj, child.slug_field): obj
+                for obj in child.get_queryset().filter(
+                    **{f'{child.slug_field}__in': data}
+                )
+            }
+        except (TypeError, ValueError):
+            child.fail('invalid')
+        result = []
+        for slug in data:
+            try:
+                result.append(objects[slug])
+            except KeyError:
+                child.fail(
+                    'does_not_exist',
+                    slug_name=child.slug_field,
+                    value=smart_str(slug)
+                )
+            except TypeError:
+                child.fail('invalid')
+        return result
+
+
+class BulkSlugRelatedField(serializers.SlugRelatedField):
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return ManySlugRelatedField(**list_kwargs)
+
 
 class TitleChangeSerializer(serializers.ModelSerializer):
     category = serializers.SlugRelatedField(
         queryset=Category.objects.all(),
         slug_field='slug')
-    genre = serializers.SlugRelatedField(
+    genre = BulkSlugRelatedField(
         queryset=Genre.objects.all(),
         slug_field='slug', many=True)
 
@@ -128,6 +275,236 @@ class TitleChangeSerializer(serializers.ModelSerializer):
             'category',
         )
         model = Title
+        read_only_fields = ('rating',)
+
+    def create(self, validated_data):
+        genres = validated_data.pop('genre')
+        title = super().create(validated_data)
+        self.set_genres(title, genres, created=True)
+        return title
+
+    def update(self, instance, validated_data):
+        genres = validated_data.pop('genre', None)
+        title = super().update(instance, validated_data)
+        if genres is not None:
+            self.set_genres(title, genres)
+        return title
+
+    def set_genres(self, title, genres, created=False):
+        """
+        Приводит жанры произведения к genres: лишние связи удаляются одним
+        DELETE, новые добавляются одним INSERT.
+        """
+        new_ids = {genre.pk for genre in genres}
+        current_ids = set() if created else set(
+            TitleGenre.objects.filter(title=title).values_list(
+                'genre_id', flat=True
+            )
+        )
+        removed_ids = current_ids - new_ids
+        if removed_ids:
+            title.genre.remove(*removed_ids)
+        added_ids = new_ids - current_ids
+        if added_ids:
+            # Title.genre.add() сначала перечитывает существующие связи,
+            # а они уже известны, поэтому вставка и сигналы - напрямую.
+            signal_kwargs = {
+                'sender': TitleGenre,
+                'instance': title,
+                'reverse': False,
+                'model': Genre,
+                'pk_set': added_ids,
+                'using': TitleGenre.objects.db,
+            }
+            m2m_changed.send(action='pre_add', **signal_kwargs)
+            TitleGenre.objects.bulk_create(
+                TitleGenre(title=title, genre_id=genre_id)
+                for genre_id in added_ids
+            )
+            m2m_changed.send(action='post_add', **signal_kwargs)
+
+
+class TitleBulkItemSerializer(serializers.Serializer):
+    external_id = serializers.CharField(max_length=64)
+    name = serializers.CharField(max_length=256)
+    year = serializers.IntegerField()
+    description = serializers.CharField()
+    genre = serializers.ListField(child=serializers.SlugField())
+    category = serializers.SlugField()
+
+
+class TitleBulkSerializer(serializers.Serializer):
+    """
+    Пакетная запись произведений партнёров по external_id: новые
+    создаются, существующие перезаписываются целиком. Ошибки отдельных
+    произведений не мешают записи остальных и попадают в результат.
+    """
+    CREATED = 'created'
+    UPDATED = 'updated'
+    INVALID = 'invalid'
+
+    titles = serializers.ListField(
+        child=serializers.JSONField(), allow_empty=False
+    )
+
+    def validate_titles(self, titles):
+        max_size = getattr(settings, 'TITLE_BULK_MAX_SIZE', 500)
+        if len(titles) > max_size:
+            raise serializers.ValidationError(
+                f'За один запрос можно передать не больше {max_size} '
+                'произведений!'
+            )
+        return titles
+
+    def validate(self, data):
+        results = []
+        items = []
+        external_ids = set()
+        for raw_item in data['titles']:
+            item = TitleBulkItemSerializer(data=raw_item)
+            result = {
+                'external_id': raw_item.get('external_id')
+                if isinstance(raw_item, dict) else None
+            }
+            results.append(result)
+            if not item.is_valid():
+                result.update(status=self.INVALID, errors=item.errors)
+            elif item.validated_data['external_id'] in external_ids:
+                result.update(status=self.INVALID, errors={
+                    'external_id': ['Произведение уже есть в запросе!']
+                })
+            else:
+                external_ids.add(item.validated_data['external_id'])
+                items.append((result, item.validated_data))
+        # Слаги всех произведений проверяются двумя запросами.
+        categories = Category.objects.in_bulk(
+            {item['category'] for _, item in items}, field_name='slug'
+        )
+        genres = Genre.objects.in_bulk(
+            {slug for _, item in items for slug in item['genre']},
+            field_name='slug'
+        )
+        data['items'] = []
+        for result, item in items:
+            errors = {}
+            if item['category'] not in categories:
+                errors['category'] = [
+                    self.get_missing_slug_error(item['category'])
+                ]
+            missing = [slug for slug in item['genre'] if slug not in genres]
+            if missing:
+                errors['genre'] = [
+                    self.get_missing_slug_error(slug) for slug in missing
+                ]
+            if errors:
+                result.update(status=self.INVALID, errors=errors)
+                continue
+            item['category'] = categories[item['category']]
+            item['genre'] = {genres[slug].pk for slug in item['genre']}
+            data['items'].append((result, item))
+        data['results'] = results
+        return data
+
+    def get_missing_slug_error(self, slug):
+        return serializers.SlugRelatedField.default_error_messages[
+            'does_not_exist'
+        ].format(slug_name='slug', value=smart_str(slug))
+
+    def create(self, validated_data):
+        items = validated_data['items']
+        if not items:
+            return validated_data['results']
+        try:
+            self.save_titles(items)
+        except IntegrityError:
+            # Транзакция уже откатилась: если новых external_id теперь нет
+            # в базе, ошибка не в параллельной записи, её не скрываем.
+            if not Title.objects.filter(external_id__in=[
+                item['external_id'] for result, item in items
+                if result['status'] == self.CREATED
+            ]).exists():
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Произведения изменены параллельным запросом, '
+                    'повторите запрос!'
+                ]
+            })
+        for result, item in items:
+            result['id'] = item['title'].pk
+        return validated_data['results']
+
+    def save_titles(self, items):
+        with transaction.atomic():
+            existing = Title.objects.select_for_update().in_bulk(
+                [item['external_id'] for _, item in items],
+                field_name='external_id'
+            )
+            created, updated = [], []
+            for result, item in items:
+                title = existing.get(item['external_id'])
+                if title is None:
+                    title = Title(external_id=item['external_id'])
+                    created.append(title)
+                    result['status'] = self.CREATED
+                else:
+                    updated.append(title)
+                    result['status'] = self.UPDATED
+                title.name = item['name']
+                title.year = item['year']
+                title.description = item['description']
+                title.category = item['category']
+                item['title'] = title
+            self.create_titles(created)
+            Title.objects.bulk_update(updated, (
+                'name', 'year', 'description', 'category'
+            ))
+            self.set_genres(
+                {item['title'].pk: item['genre'] for _, item in items},
+                updated
+            )
+            title_ids = [item['title'].pk for _, item in items]
+            # Время изменения ставится перед коммитом, а не в начале
+            # длинной транзакции: иначе лента изменений может выдать
+            # курсор новее этих записей до того, как они станут видны.
+            touch_titles(Title.objects.filter(pk__in=title_ids))
+            titles_bulk_saved.send(sender=Title, title_ids=title_ids)
+
+    def create_titles(self, titles):
+        if not titles:
+            return
+        Title.objects.bulk_create(titles)
+        if not connection.features.can_return_rows_from_bulk_insert:
+            ids = dict(Title.objects.filter(
+                external_id__in=[title.external_id for title in titles]
+            ).values_list('external_id', 'pk'))
+            for title in titles:
+                title.pk = ids[title.external_id]
+        # Сигнал post_save не отправляется, статистика создаётся здесь.
+        TitleStats.objects.bulk_create(
+            TitleStats(title=title) for title in titles
+        )
+
+    def set_genres(self, title_genres, updated):
+        """
+        Приводит жанры всех произведений к title_genres одним DELETE и
+        одним INSERT, у новых произведений связей ещё нет.
+        """
+        stale = []
+        for pk, title_id, genre_id in TitleGenre.objects.filter(
+            title__in=updated
+        ).values_list('pk', 'title_id', 'genre_id'):
+            if genre_id in title_genres[title_id]:
+                title_genres[title_id].discard(genre_id)
+            else:
+                stale.append(pk)
+        if stale:
+            TitleGenre.objects.filter(pk__in=stale).delete()
+        TitleGenre.objects.bulk_create(
+            TitleGenre(title_id=title_id, genre_id=genre_id)
+            for title_id, genre_ids in title_genres.items()
+            for genre_id in genre_ids
+        )
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -148,19 +525,23 @@ class ReviewSerializer(serializers.ModelSerializer):
         slug_field='username',
     )
 
-    def validate(self, data):
-        title_id = self.context['view'].kwargs['title_id']
-        request = self.context['request']
-        author = request.user
-        title = get_object_or_404(Title, id=title_id)
-        if (
-            title.reviews.filter(author=author).exists()
-            and request.method != 'PATCH'
-        ):
-            raise serializers.ValidationError(
-                'Можно оставлять только один отзыв!'
-            )
-        return data
+    def create(self, validated_data):
+        # Повторный отзыв отсекает ограничение unique_author_title.
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            # Review.save() откатывает свою транзакцию, так что проверить,
+            # нарушено ли именно это ограничение, можно сразу.
+            if not Review.objects.filter(
+                author_id=validated_data['author_id'],
+                title=validated_data['title']
+            ).exists():
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Можно оставлять только один отзыв!'
+                ]
+            })
 
     class Meta:
         fields = ('id', 'author', 'title', 'score', 'text', 'pub_date')
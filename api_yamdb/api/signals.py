@@ -0,0 +1,141 @@
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_save)
+from django.dispatch import receiver
+
+from api.cache import bump_namespaces
+from api.events import publish_title_event
+from api.serializers import CommentSerializer, ReviewSerializer
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from reviews.ratings import title_rating_changed
+from reviews.signals import catalogue_imported, deletion, titles_bulk_saved
+from users.models import User
+
+
+def bump_on_commit(*namespaces):
+    # Версии меняются после коммита: иначе параллельный запрос успел бы
+    # закешировать под новой версией ответ без этой записи.
+    transaction.on_commit(lambda: bump_namespaces(*namespaces))
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def title_changed(sender, instance, **kwargs):
+    bump_on_commit('titles', f'title:{instance.pk}')
+
+
+@receiver(title_rating_changed)
+def title_rating_updated(sender, title_id, rating_changed=True, **kwargs):
+    # Оценка в рейтингах меняется с каждым отзывом, а рейтинг в списке
+    # произведений - только когда меняется его целая часть.
+    namespaces = [f'title:{title_id}', 'rankings']
+    if rating_changed:
+        namespaces.append('titles')
+    bump_on_commit(*namespaces)
+
+
+@receiver(titles_bulk_saved)
+def titles_bulk_changed(sender, title_ids, **kwargs):
+    bump_on_commit(
+        'titles', *(f'title:{title_id}' for title_id in title_ids)
+    )
+
+
+@receiver(m2m_changed, sender=TitleGenre)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        bump_on_commit('titles', f'title:{instance.pk}')
+    elif pk_set:
+        bump_on_commit('titles', *(f'title:{pk}' for pk in pk_set))
+    else:
+        # После clear() со стороны жанра неизвестно, какие произведения
+        # его потеряли: карточки всех произведений зависят от genres.
+        bump_on_commit('titles', 'genres')
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def genres_changed(sender, **kwargs):
+    bump_on_commit('genres', 'titles')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def categories_changed(sender, **kwargs):
+    bump_on_commit('categories', 'titles')
+
+
+def get_comment_title_id(comment):
+    if Comment.review.is_cached(comment):
+        return comment.review.title_id
+    return Review.objects.filter(pk=comment.review_id).values_list(
+        'title_id', flat=True
+    ).first()
+
+
+# Статистика произведения входит в его пространство title:<id>, а
+# title-stats сбрасывает только списки с ?expand=stats.
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, **kwargs):
+    bump_on_commit(f'title:{instance.title_id}', 'title-stats')
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    bump_on_commit(
+        f'title:{instance.title_id}', f'review:{instance.pk}', 'title-stats'
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    # Вместе с отзывом сбрасываются и кеши его комментариев.
+    if deletion.includes_review(instance.review_id):
+        return
+    namespaces = [f'review:{instance.review_id}', 'title-stats']
+    title_id = get_comment_title_id(instance)
+    if title_id is not None:
+        namespaces.append(f'title:{title_id}')
+    bump_on_commit(*namespaces)
+
+
+@receiver(post_init, sender=User)
+def remember_username(sender, instance, **kwargs):
+    instance._saved_username = instance.__dict__.get('username')
+
+
+@receiver(post_save, sender=User)
+def user_renamed(sender, instance, created, **kwargs):
+    # Имя автора выводится в отзывах и комментариях, а переименования
+    # редки, поэтому сбрасываются сразу все их кеши.
+    if not created and instance.username != instance._saved_username:
+        bump_on_commit('authors')
+    remember_username(sender, instance)
+
+
+@receiver(post_save, sender=Review)
+def publish_review(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: publish_title_event(
+            instance.title_id,
+            'review',
+            lambda: ReviewSerializer(instance).data
+        ))
+
+
+@receiver(post_save, sender=Comment)
+def publish_comment(sender, instance, created, **kwargs):
+    if created:
+        title_id = get_comment_title_id(instance)
+        transaction.on_commit(lambda: publish_title_event(
+            title_id, 'comment', lambda: CommentSerializer(instance).data
+        ))
+
+
+@receiver(catalogue_imported)
+def catalogue_reloaded(sender, **kwargs):
+    bump_on_commit('catalogue')
@@ -1,7 +1,8 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from api.views import (TitleViewSet,
+from api.views import (ChangesViewSet,
+                       TitleViewSet,
                        GenreViewSet,
                        CategoryViewSet,
                        CommentViewSet,
@@ -27,6 +28,7 @@ router_v1.register(
     basename='comments'
 )
 router_v1.register('users', UserViewSet, basename='users')
+router_v1.register('changes', ChangesViewSet, basename='changes')
 
 auth_urls = [
     path(
@@ -1,13 +1,18 @@
-from django.core.mail import send_mail
-
 from api_yamdb.settings import EMAIL_YAMDB
+from users.outbox import enqueue_email
 
 
 def send_confirmation_code(email, confirmation_code):
-    send_mail(
+    enqueue_email(
         subject='Код подтверждения',
         message=f'Ваш код подтверждения: {confirmation_code}',
         from_email=EMAIL_YAMDB,
-        recipient_list=(email,),
-        fail_silently=False
+        recipient=email
     )
+
+
+def get_expanded_fields(request):
+    """Дополнительные поля из параметра ?expand=a,b запроса."""
+    if request is None:
+        return set()
+    return set(filter(None, request.GET.get('expand', '').split(',')))
@@ -1,9 +1,9 @@
-from api.filters import TitleFilter
+from api.filters import TitleFilter, TitleSearchFilter
 
+from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Avg
 
 from rest_framework import (filters,
                             mixins,
@@ -13,16 +13,30 @@ from rest_framework import (filters,
                             pagination)
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework.utils.urls import replace_query_param
 from django_filters.rest_framework import DjangoFilterBackend
 
-from reviews.models import Title, Genre, Category, Review, Title
+from reviews.models import (Title, Genre, Category, Review, TitleRanking,
+                            TitleStats)
+from reviews.stats import STATS_FIELDS
+from users.authentication import get_user_instance
 from users.models import User
+from users.tokens import RoleAccessToken
+from api.cache import (AnonymousResponseCacheMixin, ConditionalGetMixin,
+                       ConditionalListMixin)
+from api.changes import decode_cursor, encode_cursor, get_changes
+from api.pagination import PubDateKeysetPagination
+from api.projections import (CommentProjection, ProjectionListMixin,
+                             ReviewProjection, TitleProjection)
+from api.query_budget import QueryBudgetMixin
 from api.permissions import (AnonReadOnly,
                              IsSuperUserOrAdminAndIsAuth,
                              IsSuperUserOrAdminOrModerOrAuthorAndIsAuth)
-from api.serializers import (TitleChangeSerializer,
+from api.serializers import (TitleBulkSerializer,
+                             TitleChangeSerializer,
                              TitleReadSerializer,
+                             TitleTopQuerySerializer,
+                             TitleTopSerializer,
                              GenreSerializer,
                              CategorySerializer,
                              CommentSerializer,
@@ -31,10 +45,11 @@ from api.serializers import (TitleChangeSerializer,
                              UserCreateSerializer,
                              UserReceiveTokenSerializer)
 
-from api.utils import send_confirmation_code
+from api.utils import get_expanded_fields, send_confirmation_code
 
 
-class UserViewSet(mixins.CreateModelMixin,
+class UserViewSet(QueryBudgetMixin,
+                  mixins.CreateModelMixin,
                   mixins.ListModelMixin,
                   viewsets.GenericViewSet):
     queryset = User.objects.all()
@@ -71,19 +86,21 @@ class UserViewSet(mixins.CreateModelMixin,
         permission_classes=(permissions.IsAuthenticated,)
     )
     def get_me_data(self, request):
+        user = get_user_instance(request.user)
         if request.method == 'PATCH':
             serializer = UserSerializer(
-                request.user, data=request.data,
+                user, data=request.data,
                 partial=True, context={'request': request}
             )
             serializer.is_valid(raise_exception=True)
-            serializer.save(role=request.user.role)
+            serializer.save(role=user.role)
             return Response(serializer.data, status=status.HTTP_200_OK)
-        serializer = UserSerializer(request.user)
+        serializer = UserSerializer(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class UserCreateViewSet(mixins.CreateModelMixin,
+class UserCreateViewSet(QueryBudgetMixin,
+                        mixins.CreateModelMixin,
                         viewsets.GenericViewSet):
     queryset = User.objects.all()
     serializer_class = UserCreateSerializer
@@ -91,26 +108,18 @@ class UserCreateViewSet(mixins.CreateModelMixin,
 
     def create(self, request):
         serializer = UserCreateSerializer(data=request.data)
-        username = request.data.get('username')
-        email = request.data.get('email')
-        if serializer.is_valid() or User.objects.filter(
-            username=username,
-            email=email
-        ).exists():
-            user, _ = User.objects.get_or_create(
-                username=username,
-                email=email
-            )
-            confirmation_code = default_token_generator.make_token(user)
-            send_confirmation_code(
-                email=user.email,
-                confirmation_code=confirmation_code
-            )
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.save()
+        confirmation_code = default_token_generator.make_token(user)
+        send_confirmation_code(
+            email=user.email,
+            confirmation_code=confirmation_code
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class UserReceiveTokenViewSet(mixins.CreateModelMixin,
+class UserReceiveTokenViewSet(QueryBudgetMixin,
+                              mixins.CreateModelMixin,
                               viewsets.GenericViewSet):
     queryset = User.objects.all()
     serializer_class = UserReceiveTokenSerializer
@@ -125,19 +134,81 @@ class UserReceiveTokenViewSet(mixins.CreateModelMixin,
         if not default_token_generator.check_token(user, confirmation_code):
             message = {'confirmation_code': 'Код подтверждения невалиден!'}
             return Response(message, status=status.HTTP_400_BAD_REQUEST)
-        message = {'token': str(AccessToken.for_user(user))}
+        message = {'token': str(RoleAccessToken.for_user(user))}
         return Response(message, status=status.HTTP_200_OK)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all().annotate(
-        Avg('reviews__score')
+class TitleViewSet(ConditionalGetMixin,
+                   AnonymousResponseCacheMixin,
+                   QueryBudgetMixin,
+                   ProjectionListMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre'
     ).order_by('name')
     permission_classes = (AnonReadOnly | IsSuperUserOrAdminAndIsAuth,)
-    filter_backends = (DjangoFilterBackend, )
+    filter_backends = (DjangoFilterBackend, TitleSearchFilter)
     filterset_class = TitleFilter
     http_method_names = ['get', 'post', 'head', 'delete', 'patch']
     pagination_class = pagination.PageNumberPagination
+    list_projection = TitleProjection()
+
+    def get_cache_namespaces(self, pk=None, **kwargs):
+        action = self.action_map.get('get')
+        if action == 'retrieve':
+            # Карточка со статистикой зависит только от своего произведения
+            # и от названий жанров и категорий.
+            return (f'title:{pk}', 'genres', 'categories')
+        namespaces = ('titles', 'rankings') if action == 'top' else (
+            'titles',
+        )
+        if 'stats' in get_expanded_fields(self.request):
+            namespaces += ('title-stats',)
+        return namespaces
+
+    def get_list_projection(self):
+        if 'stats' in get_expanded_fields(self.request):
+            return None
+        return super().get_list_projection()
+
+    def get_query_budget(self):
+        budget = super().get_query_budget()
+        # Поиск проверяет, есть ли точные совпадения, а без них отбирает
+        # произведения по общим триграммам.
+        if (budget is not None and self.action == 'list'
+                and self.request.query_params.get(
+                    TitleSearchFilter.search_param, ''
+                ).strip()):
+            budget += 2
+        return budget
+
+    def get_list_validators(self, queryset):
+        # Счётчики статистики меняются без updated_at произведений, поэтому
+        # список с ними отдаётся без условных заголовков.
+        if 'stats' in get_expanded_fields(self.request):
+            return None
+        return super().get_list_validators(queryset)
+
+    def get_object_validators(self, instance):
+        state, last_modified = super().get_object_validators(instance)
+        if 'stats' in get_expanded_fields(self.request):
+            try:
+                stats = instance.stats
+            except TitleStats.DoesNotExist:
+                # Запись статистики собирается заново после коммита (см.
+                # reviews.stats), до тех пор ответ отдаётся без неё.
+                stats = None
+            if stats is not None:
+                state = (*state, *(
+                    getattr(stats, field) for field in STATS_FIELDS
+                ))
+        return state, last_modified
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if 'stats' in get_expanded_fields(self.request):
+            queryset = queryset.select_related('stats')
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'list' or self.action == 'retrieve':
@@ -145,8 +216,54 @@ class TitleViewSet(viewsets.ModelViewSet):
         else:
             return TitleChangeSerializer
 
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='bulk',
+        url_name='bulk',
+        permission_classes=(IsSuperUserOrAdminAndIsAuth,),
+        filter_backends=(),
+        pagination_class=None
+    )
+    def bulk(self, request):
+        serializer = TitleBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.save(), status=status.HTTP_200_OK)
+
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path='top',
+        url_name='top',
+        filter_backends=(),
+        pagination_class=None
+    )
+    def top(self, request):
+        query = TitleTopQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        rankings = TitleRanking.objects.filter(
+            scope=query.validated_data['scope'],
+            key=query.validated_data['key'],
+            score__isnull=False
+        ).select_related('title__category').prefetch_related(
+            'title__genre'
+        ).order_by('-score', 'title')
+        if 'stats' in get_expanded_fields(request):
+            rankings = rankings.select_related('title__stats')
+        titles = []
+        for ranking in rankings[:query.validated_data['limit']]:
+            ranking.title.ranking_score = ranking.score
+            titles.append(ranking.title)
+        serializer = TitleTopSerializer(
+            titles, many=True, context=self.get_serializer_context()
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
 
-class GenreCategoryViewSet(mixins.ListModelMixin,
+class GenreCategoryViewSet(ConditionalListMixin,
+                           AnonymousResponseCacheMixin,
+                           QueryBudgetMixin,
+                           mixins.ListModelMixin,
                            mixins.CreateModelMixin,
                            mixins.DestroyModelMixin,
                            viewsets.GenericViewSet,):
@@ -168,35 +285,101 @@ class CategoryViewSet(GenreCategoryViewSet):
     serializer_class = CategorySerializer
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin,
+                     AnonymousResponseCacheMixin,
+                     QueryBudgetMixin,
+                     ProjectionListMixin,
+                     viewsets.ModelViewSet):
     serializer_class = CommentSerializer
+    list_projection = CommentProjection()
+    # В записях списка выводится имя автора.
+    list_updated_fields = ('updated_at', 'author__updated_at')
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,
                           IsSuperUserOrAdminOrModerOrAuthorAndIsAuth,)
-    pagination_class = pagination.PageNumberPagination
+    pagination_class = PubDateKeysetPagination
     http_method_names = ['get', 'post', 'head', 'delete', 'patch']
 
+    def get_cache_namespaces(self, review_id, **kwargs):
+        return (f'review:{review_id}', 'authors')
+
     def get_review(self):
-        return get_object_or_404(Review, pk=self.kwargs.get('review_id'))
+        if getattr(self, 'review', None) is None:
+            # Отзыв ищется по первичному ключу вместе с произведением, так
+            # что чужой title_id в адресе даёт 404 без лишнего запроса.
+            self.review = get_object_or_404(
+                Review,
+                pk=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id')
+            )
+        return self.review
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return self.get_review().comments.select_related('author')
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, review=self.get_review())
+        serializer.save(
+            author_id=self.request.user.id, review=self.get_review()
+        )
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin,
+                    AnonymousResponseCacheMixin,
+                    QueryBudgetMixin,
+                    ProjectionListMixin,
+                    viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
+    list_projection = ReviewProjection()
+    # В записях списка выводится имя автора.
+    list_updated_fields = ('updated_at', 'author__updated_at')
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,
                           IsSuperUserOrAdminOrModerOrAuthorAndIsAuth,)
-    pagination_class = pagination.PageNumberPagination
+    pagination_class = PubDateKeysetPagination
     http_method_names = ['get', 'post', 'head', 'delete', 'patch']
 
+    def get_cache_namespaces(self, title_id, **kwargs):
+        return (f'title:{title_id}', 'authors')
+
     def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+        if getattr(self, 'title', None) is None:
+            self.title = get_object_or_404(
+                Title, pk=self.kwargs.get('title_id')
+            )
+        return self.title
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return self.get_title().reviews.select_related('author')
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        serializer.save(
+            author_id=self.request.user.id, title=self.get_title()
+        )
+
+
+class ChangesViewSet(QueryBudgetMixin, viewsets.GenericViewSet):
+    """
+    Лента изменений каталога для синхронизации клиентов: ?since=<cursor>
+    отдаёт записи, изменённые или удалённые после курсора. Без since
+    лента начинается с начала, то есть выдаёт весь каталог.
+    """
+    permission_classes = (permissions.AllowAny,)
+    pagination_class = None
+    cursor_query_param = 'since'
+
+    def list(self, request):
+        position = decode_cursor(
+            request.query_params.get(self.cursor_query_param)
+        )
+        changes, position, has_more = get_changes(
+            position, getattr(settings, 'CHANGES_PAGE_SIZE', 100)
+        )
+        cursor = encode_cursor(position)
+        next_link = None
+        if has_more:
+            next_link = replace_query_param(
+                request.build_absolute_uri(), self.cursor_query_param, cursor
+            )
+        return Response({
+            'cursor': cursor,
+            'next': next_link,
+            'results': changes,
+        }, status=status.HTTP_200_OK)
@@ -13,4 +13,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Потоки событий (/api/v1/titles/<id>/events/) обслуживаются в цикле
+# событий ASGI, все остальные запросы - приложением Django.
+from api.events import EventsRouter  # noqa: E402
+
+application = EventsRouter(django_application)
@@ -77,6 +77,15 @@ DATABASES = {
 
 DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = 60
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -122,19 +131,88 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.RoleJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': [
         'rest_framework.pagination.PageNumberPagination'
     ],
     'PAGE_SIZE': 5,
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# Проверка бюджетов запросов сохраняет SQL каждого запроса, поэтому она
+# включается только при отладке (и в тестах, где превышение - ошибка).
+QUERY_BUDGET_MODE = 'warn' if DEBUG else None
+
+# В бюджет списков входит запрос ETag и Last-Modified (api.cache).
+QUERY_BUDGETS = {
+    'titles-list': 4,
+    'titles-retrieve': 2,
+    'titles-top': 2,
+    # Проверка слагов (2), запись в транзакции: BEGIN, выборка по
+    # external_id, INSERT произведений и выборка их id (без RETURNING),
+    # INSERT статистики, UPDATE, выборка, DELETE и INSERT связей с
+    # жанрами, UPDATE времени изменения (10), пересчёт рейтингов: выборка,
+    # BEGIN, DELETE, жанры, средняя оценка каталога, INSERT (6). От
+    # размера пакета не зависит.
+    'titles-bulk': 2 + 10 + 6,
+    'genres-list': 3,
+    'categories-list': 3,
+    'reviews-list': 4,
+    'reviews-retrieve': 2,
+    'comments-list': 4,
+    'comments-retrieve': 2,
+    'users-list': 2,
+    'changes-list': 7,
+}
+
+# Байесовский рейтинг: вес средней оценки каталога в отзывах. Сама
+# средняя хранится в строках рейтинга и обновляется командой
+# rebuild_rankings, которую стоит запускать по расписанию.
+RANKING_PRIOR_WEIGHT = 10
+
+# Наибольшее число произведений в одном запросе POST /titles/bulk/.
+TITLE_BULK_MAX_SIZE = 500
+
+# Лента изменений: размер страницы, задержка в секундах, после которой
+# запись считается зафиксированной, и срок хранения отметок об удалении.
+CHANGES_PAGE_SIZE = 100
+CHANGES_SETTLE_TIME = 2
+TOMBSTONE_RETENTION_DAYS = 30
+
+# События новых отзывов и комментариев (SSE): брокер, раздающий их
+# подключениям, интервал комментария-пинга в секундах и размер очереди
+# одного подключения. InProcessBroker работает в пределах процесса.
+EVENTS_BROKER = 'api.events.InProcessBroker'
+EVENTS_HEARTBEAT = 15
+EVENTS_QUEUE_SIZE = 100
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Версии токенов пользователей кешируются, чтобы проверять токен без
+# обращения к БД. С общим кешем (Redis, Memcached) отзыв срабатывает сразу,
+# с локальным - не позже чем через TOKEN_VERSION_CACHE_TIMEOUT секунд.
+TOKEN_VERSION_CACHE_ALIAS = 'default'
+TOKEN_VERSION_CACHE_TIMEOUT = 30
+
+# Кеш пользователей в памяти процесса для токенов без ролей.
+USER_CACHE_MAX_SIZE = 1024
+USER_CACHE_TIMEOUT = 60
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 EMAIL_YAMDB = 'admin@admin.ru'
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60
@@ -0,0 +1,162 @@
+import csv
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import groupby
+from pathlib import Path
+from typing import Any
+
+import django
+from django.core.management.base import (BaseCommand, CommandError,
+                                         CommandParser)
+from django.db import connections
+
+from reviews.models import Comment, Review, Title, TitleGenre
+from users.models import User
+
+
+def export_titles(chunk_size):
+    # Жанры читаются вторым потоком в том же порядке title_id и
+    # сливаются с произведениями, поэтому память не растёт с таблицей.
+    genres = groupby(
+        TitleGenre.objects.order_by('title_id', 'genre__slug').values_list(
+            'title_id', 'genre__slug'
+        ).iterator(chunk_size=chunk_size),
+        key=lambda row: row[0]
+    )
+    title_id, slugs = next(genres, (None, ()))
+    for row in Title.objects.order_by('id').values(
+        'id', 'name', 'year', 'category__slug', 'rating', 'description'
+    ).iterator(chunk_size=chunk_size):
+        while title_id is not None and title_id < row['id']:
+            title_id, slugs = next(genres, (None, ()))
+        row['genre'] = (
+            [slug for _, slug in slugs] if title_id == row['id'] else []
+        )
+        row['category'] = row.pop('category__slug')
+        yield row
+
+
+def with_author(rows):
+    for row in rows:
+        row['author'] = row.pop('author__username')
+        yield row
+
+
+def export_reviews(chunk_size):
+    yield from with_author(Review.objects.order_by('id').values(
+        'id', 'title_id', 'author__username', 'score', 'text', 'pub_date'
+    ).iterator(chunk_size=chunk_size))
+
+
+def export_comments(chunk_size):
+    yield from with_author(Comment.objects.order_by('id').values(
+        'id', 'review_id', 'author__username', 'text', 'pub_date'
+    ).iterator(chunk_size=chunk_size))
+
+
+def export_users(chunk_size):
+    yield from User.objects.order_by('id').values(
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'
+    ).iterator(chunk_size=chunk_size)
+
+
+TABLES = {
+    'titles': export_titles,
+    'reviews': export_reviews,
+    'comments': export_comments,
+    'users': export_users,
+}
+# Заголовок CSV пишется и для пустой таблицы, поэтому столбцы заданы
+# заранее, а не берутся из первой строки.
+COLUMNS = {
+    'titles': (
+        'id', 'name', 'year', 'rating', 'description', 'genre', 'category'
+    ),
+    'reviews': ('id', 'title_id', 'score', 'text', 'pub_date', 'author'),
+    'comments': ('id', 'review_id', 'text', 'pub_date', 'author'),
+    'users': (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'
+    ),
+}
+FORMATS = ('csv', 'jsonl')
+
+
+def write_csv(rows, output, columns):
+    writer = csv.DictWriter(output, fieldnames=columns)
+    writer.writeheader()
+    for row in rows:
+        if isinstance(row.get('genre'), list):
+            row['genre'] = ','.join(row['genre'])
+        writer.writerow(row)
+
+
+def write_jsonl(rows, output, columns):
+    for row in rows:
+        output.write(json.dumps(row, ensure_ascii=False, default=str))
+        output.write('\n')
+
+
+def export_table(name, directory, output_format, chunk_size):
+    """Выгружает одну таблицу в файл; выполняется и в дочернем процессе."""
+    started = time.monotonic()
+    path = Path(directory) / f'{name}.{output_format}'
+    writer = write_csv if output_format == 'csv' else write_jsonl
+    count = 0
+
+    def counted(rows):
+        nonlocal count
+        for count, row in enumerate(rows, 1):
+            yield row
+
+    with open(path, 'w', encoding='utf-8', newline='') as output:
+        writer(counted(TABLES[name](chunk_size)), output, COLUMNS[name])
+    return name, count, time.monotonic() - started
+
+
+class Command(BaseCommand):
+    help = 'Export titles, reviews, comments and users to CSV or JSONL'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            'tables', nargs='*',
+            help=f'Tables to export: {", ".join(TABLES)}; all by default'
+        )
+        parser.add_argument('--output', type=Path, default=Path('export'))
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Export tables in this many parallel processes'
+        )
+
+    def handle(self, *args: Any, **options: Any):
+        unknown = set(options['tables']) - set(TABLES)
+        if unknown:
+            raise CommandError(f'Unknown tables: {", ".join(unknown)}')
+        tables = options['tables'] or list(TABLES)
+        options['output'].mkdir(parents=True, exist_ok=True)
+        arguments = [
+            (name, options['output'], options['format'],
+             options['chunk_size'])
+            for name in tables
+        ]
+        if options['workers'] <= 1:
+            results = (export_table(*arguments) for arguments in arguments)
+        else:
+            # Дочерние процессы открывают собственные соединения с БД.
+            connections.close_all()
+            executor = ProcessPoolExecutor(
+                max_workers=options['workers'], initializer=django.setup
+            )
+            with executor:
+                results = [
+                    future.result() for future in as_completed([
+                        executor.submit(export_table, *arguments)
+                        for arguments in arguments
+                    ])
+                ]
+        for name, count, elapsed in results:
+            self.stdout.write(self.style.SUCCESS(
+                f'{name}: {count} rows in {elapsed:.2f}s'
+            ))
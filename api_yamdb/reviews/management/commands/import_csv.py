@@ -1,24 +1,188 @@
-import pandas
+import csv
+import time
+from datetime import timedelta
+from itertools import islice
+from pathlib import Path
 from typing import Any
 
-from django.core.management.base import BaseCommand, CommandParser
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import (BaseCommand, CommandError,
+                                         CommandParser)
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
 
-from reviews.models import TitleGenre
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleGenre, TitleRanking, TitleStats, Tombstone)
+from reviews.rankings import rebuild_rankings
+from reviews.ratings import recompute_ratings
+from reviews.stats import recompute_title_stats
+from reviews.signals import catalogue_imported
+from users.models import User
+
+# Порядок наборов соответствует зависимостям между таблицами.
+DATASETS = {
+    'users': ('users.csv', User),
+    'category': ('category.csv', Category),
+    'genre': ('genre.csv', Genre),
+    'titles': ('titles.csv', Title),
+    'genre_title': ('genre_title.csv', TitleGenre),
+    'review': ('review.csv', Review),
+    'comments': ('comments.csv', Comment),
+}
+# Таблицы ленты изменений с полем updated_at.
+CHANGE_FEED_MODELS = (Category, Genre, Title, Review, Comment)
+# Таблицы, которые пересчитываются после загрузки и очищаются вместе
+# со своей основной таблицей.
+DERIVED_MODELS = {Title: (TitleStats, TitleRanking)}
+DATASET_MODELS = {model for _, model in DATASETS.values()}
+RENAMED_COLUMNS = {
+    'author': 'author_id',
+    'category': 'category_id',
+}
 
 
 class Command(BaseCommand):
-    help = 'Import from CSV'
+    help = 'Import static/data CSV files in dependency order'
 
     def add_arguments(self, parser: CommandParser) -> None:
-        parser.add_argument('csv_file', type=str)
+        parser.add_argument(
+            'datasets', nargs='*',
+            help=f'Datasets to import: {", ".join(DATASETS)}; all by default'
+        )
+        parser.add_argument(
+            '--path', type=Path, default=settings.BASE_DIR / 'static' / 'data'
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument(
+            '--truncate', action='store_true',
+            help='Delete existing rows of imported tables first'
+        )
+        parser.add_argument(
+            '--ignore-conflicts', action='store_true',
+            help='Skip rows that violate unique constraints'
+        )
 
     def handle(self, *args: Any, **options: Any):
-        csv_file = options['csv_file']
-        df = pandas.read_csv(csv_file)
-
-        for index, row in df.iterrows():
-            TitleGenre.objects.create(
-                id=row['id'],
-                title_id=row['title_id'],
-                genre_id=row['genre_id']
+        unknown = set(options['datasets']) - set(DATASETS)
+        if unknown:
+            raise CommandError(f'Unknown datasets: {", ".join(unknown)}')
+        names = [
+            name for name in DATASETS
+            if not options['datasets'] or name in options['datasets']
+        ]
+        models = [DATASETS[name][1] for name in names]
+        with transaction.atomic():
+            started = timezone.now()
+            if options['truncate']:
+                self.truncate(models)
+            for name in names:
+                filename, model = DATASETS[name]
+                self.import_file(
+                    options['path'] / filename, model, name, options
+                )
+            self.reset_sequences(models)
+            if Review in models or Title in models:
+                recompute_ratings(Title, Review)
+            if {Title, Review, Comment} & set(models):
+                recompute_title_stats(Title, Review, Comment, TitleStats)
+            if {Title, TitleGenre, Review} & set(models):
+                rebuild_rankings(Title, TitleGenre, TitleRanking)
+            self.stamp_changes(started)
+        catalogue_imported.send(sender=self.__class__, models=models)
+
+    def truncate(self, models):
+        """
+        Удаляет строки загружаемых таблиц, начиная с дочерних, без каскада:
+        таблица, на которую ссылаются другие, очищается только вместе с
+        ними. Для таблиц ленты изменений пишутся отметки об удалении.
+        """
+        for model in models:
+            derived = DERIVED_MODELS.get(model, ())
+            for relation in model._meta.related_objects:
+                dependent = relation.related_model
+                if (relation.many_to_many or dependent in models
+                        or dependent in derived):
+                    continue
+                if dependent in DATASET_MODELS or dependent.objects.exists():
+                    raise CommandError(
+                        f'Cannot truncate {model._meta.db_table}: '
+                        f'{dependent._meta.db_table} references it'
+                    )
+        deleted_at = connection.ops.adapt_datetimefield_value(timezone.now())
+        tombstones = connection.ops.quote_name(Tombstone._meta.db_table)
+        with connection.cursor() as cursor:
+            for model in reversed(models):
+                for table_model in (*DERIVED_MODELS.get(model, ()), model):
+                    table = connection.ops.quote_name(
+                        table_model._meta.db_table
+                    )
+                    if table_model in CHANGE_FEED_MODELS:
+                        cursor.execute(
+                            f'INSERT INTO {tombstones} '
+                            f'(model, object_id, deleted_at) '
+                            f'SELECT %s, id, %s FROM {table}',
+                            [table_model._meta.model_name, deleted_at]
+                        )
+                    cursor.execute(f'DELETE FROM {table}')
+
+    def stamp_changes(self, started):
+        # Загрузка идёт дольше окна CHANGES_SETTLE_TIME ленты изменений,
+        # поэтому записанные строки получают время перед самым коммитом.
+        # Отметки об удалении при --truncate идут раньше: загруженные
+        # заново строки сохраняют прежние id.
+        deleted_at = timezone.now()
+        Tombstone.objects.filter(deleted_at__gte=started).update(
+            deleted_at=deleted_at
+        )
+        now = deleted_at + timedelta(microseconds=1)
+        for model in CHANGE_FEED_MODELS:
+            model.objects.filter(updated_at__gte=started).update(
+                updated_at=now
             )
+
+    def reset_sequences(self, models):
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            with connection.cursor() as cursor:
+                cursor.execute(sql)
+
+    def import_file(self, path, model, name, options):
+        try:
+            csv_file = open(path, encoding='utf-8', newline='')
+        except OSError as error:
+            raise CommandError(f'{name}: {error}')
+        started = time.monotonic()
+        total = 0
+        with csv_file:
+            rows = map(self.prepare_row(model), csv.DictReader(csv_file))
+            while True:
+                chunk = [
+                    model(**fields)
+                    for fields in islice(rows, options['chunk_size'])
+                ]
+                if not chunk:
+                    break
+                model.objects.bulk_create(
+                    chunk, ignore_conflicts=options['ignore_conflicts']
+                )
+                total += len(chunk)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{name}: {total} rows in {elapsed:.2f}s '
+            f'({total / elapsed if elapsed else total:.0f} rows/sec)'
+        ))
+
+    def prepare_row(self, model):
+        if model is User:
+            def prepare(row):
+                return {**row, 'password': make_password(None)}
+        else:
+            prepare = self.rename_columns
+        return prepare
+
+    def rename_columns(self, row):
+        return {
+            RENAMED_COLUMNS.get(column, column): value
+            for column, value in row.items()
+        }
@@ -0,0 +1,28 @@
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils import timezone
+
+from reviews.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = 'Delete tombstones older than the change feed retention period'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--days', type=int,
+            default=settings.TOMBSTONE_RETENTION_DAYS,
+            help='Keep tombstones for this many days; the change feed '
+                 'rejects older cursors with the same setting'
+        )
+
+    def handle(self, *args: Any, **options: Any):
+        deleted, _ = Tombstone.objects.filter(
+            deleted_at__lt=timezone.now() - timedelta(days=options['days'])
+        ).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f'Tombstones deleted: {deleted}')
+        )
@@ -0,0 +1,21 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from reviews.models import Title, TitleGenre, TitleRanking
+from reviews.rankings import rebuild_rankings
+
+
+class Command(BaseCommand):
+    help = 'Rebuild title leaderboards and refresh the catalogue mean score'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args: Any, **options: Any):
+        created = rebuild_rankings(
+            Title, TitleGenre, TitleRanking, options['batch_size']
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Ranking rows rebuilt: {created}')
+        )
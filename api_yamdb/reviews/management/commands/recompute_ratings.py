@@ -0,0 +1,26 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from reviews.models import Comment, Review, Title, TitleStats
+from reviews.ratings import recompute_ratings
+from reviews.stats import recompute_title_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored title ratings and review statistics'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args: Any, **options: Any):
+        fixed = recompute_ratings(Title, Review, options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Ratings fixed for {fixed} titles')
+        )
+        processed = recompute_title_stats(
+            Title, Review, Comment, TitleStats, options['batch_size']
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Statistics rebuilt for {processed} titles')
+        )
@@ -0,0 +1,48 @@
+# Generated by Django 3.2 on 2026-10-18 17:36
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_score_counters(apps, schema_editor):
+    # Копия reviews.ratings.recompute_ratings на момент миграции: код
+    # приложения меняется вместе с моделями, а миграция - нет.
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    totals = {
+        row['title_id']: row
+        for row in Review.objects.order_by().values('title_id').annotate(
+            total=Sum('score'), count=Count('id')
+        )
+    }
+    changed = []
+    for title in Title.objects.only('score_sum', 'score_count', 'rating'):
+        row = totals.get(title.pk, {'total': 0, 'count': 0})
+        title.score_sum = row['total']
+        title.score_count = row['count']
+        title.rating = row['total'] // row['count'] if row['count'] else None
+        changed.append(title)
+    Title.objects.bulk_update(
+        changed, ('score_sum', 'score_count', 'rating'), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='score_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_score_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 17:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_review_comment_pub_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='title',
+            name='year',
+            field=models.IntegerField(db_index=True, verbose_name='Год создания'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 3.2 on 2026-10-18 17:43
+
+from django.db import migrations
+
+# SQL поискового индекса на момент миграции: reviews.search меняется
+# вместе с кодом, а миграция - нет.
+SQLITE_INDEX_SQL = (
+    "CREATE VIRTUAL TABLE reviews_title_search USING fts5("
+    "name, description, content='reviews_title', content_rowid='id', "
+    "tokenize='trigram')",
+    "CREATE TRIGGER reviews_title_search_insert AFTER INSERT ON reviews_title "
+    "BEGIN "
+    "INSERT INTO reviews_title_search(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); "
+    "END",
+    "CREATE TRIGGER reviews_title_search_delete AFTER DELETE ON reviews_title "
+    "BEGIN "
+    "INSERT INTO reviews_title_search(reviews_title_search, rowid, name, "
+    "description) VALUES ('delete', old.id, old.name, old.description); "
+    "END",
+    "CREATE TRIGGER reviews_title_search_update "
+    "AFTER UPDATE OF name, description ON reviews_title "
+    "BEGIN "
+    "INSERT INTO reviews_title_search(reviews_title_search, rowid, name, "
+    "description) VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO reviews_title_search(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); "
+    "END",
+    "INSERT INTO reviews_title_search(reviews_title_search) "
+    "VALUES ('rebuild')",
+)
+SQLITE_DROP_INDEX_SQL = (
+    'DROP TRIGGER IF EXISTS reviews_title_search_insert',
+    'DROP TRIGGER IF EXISTS reviews_title_search_delete',
+    'DROP TRIGGER IF EXISTS reviews_title_search_update',
+    'DROP TABLE IF EXISTS reviews_title_search',
+)
+POSTGRESQL_INDEX_SQL = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    "ALTER TABLE reviews_title ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+    ") STORED",
+    'CREATE INDEX reviews_title_search_vector_idx '
+    'ON reviews_title USING GIN (search_vector)',
+    'CREATE INDEX reviews_title_name_trgm_idx '
+    'ON reviews_title USING GIN (name gin_trgm_ops)',
+)
+POSTGRESQL_DROP_INDEX_SQL = (
+    'DROP INDEX IF EXISTS reviews_title_name_trgm_idx',
+    'ALTER TABLE reviews_title DROP COLUMN IF EXISTS search_vector',
+)
+
+
+def create_search_index(apps, schema_editor):
+    statements = {
+        'sqlite': SQLITE_INDEX_SQL,
+        'postgresql': POSTGRESQL_INDEX_SQL,
+    }.get(schema_editor.connection.vendor, ())
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    statements = {
+        'sqlite': SQLITE_DROP_INDEX_SQL,
+        'postgresql': POSTGRESQL_DROP_INDEX_SQL,
+    }.get(schema_editor.connection.vendor, ())
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_year_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 3.2 on 2026-10-18 17:58
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+import django.db.models.deletion
+
+
+def fill_rankings(apps, schema_editor):
+    # Копия reviews.rankings.rebuild_rankings на момент миграции: код
+    # приложения меняется вместе с моделями, а миграция - нет.
+    Title = apps.get_model('reviews', 'Title')
+    TitleGenre = apps.get_model('reviews', 'TitleGenre')
+    TitleRanking = apps.get_model('reviews', 'TitleRanking')
+    totals = Title.objects.aggregate(
+        total=Sum('score_sum'), count=Sum('score_count')
+    )
+    mean = totals['total'] / totals['count'] if totals['count'] else 0
+    weight = getattr(settings, 'RANKING_PRIOR_WEIGHT', 10)
+    genre_slugs = {}
+    for title_id, slug in TitleGenre.objects.values_list(
+        'title_id', 'genre__slug'
+    ):
+        genre_slugs.setdefault(title_id, []).append(slug)
+    rankings = []
+    for pk, category_slug, year, score_sum, score_count in (
+        Title.objects.values_list(
+            'pk', 'category__slug', 'year', 'score_sum', 'score_count'
+        )
+    ):
+        score = (
+            (weight * mean + score_sum) / (weight + score_count)
+            if score_count else None
+        )
+        keys = [('all', ''), ('year', str(year))]
+        if category_slug is not None:
+            keys.append(('category', category_slug))
+        keys.extend(('genre', slug) for slug in genre_slugs.get(pk, []))
+        rankings.extend(
+            TitleRanking(title_id=pk, scope=scope, key=key, score=score)
+            for scope, key in keys
+        )
+    TitleRanking.objects.bulk_create(rankings, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('all', 'Все произведения'), ('category', 'Категория'), ('genre', 'Жанр'), ('year', 'Год')], max_length=16, verbose_name='Срез')),
+                ('key', models.CharField(blank=True, max_length=50, verbose_name='Значение среза')),
+                ('score', models.FloatField(null=True, verbose_name='Взвешенная оценка')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.title')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Рейтинги произведений',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['scope', 'key', '-score', 'title'], name='title_ranking_score_idx'),
+        ),
+        migrations.RunPython(fill_rankings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 3.2 on 2026-10-18 18:03
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+import django.db.models.deletion
+
+
+def fill_title_stats(apps, schema_editor):
+    # Копия reviews.stats.recompute_title_stats на момент миграции: код
+    # приложения меняется вместе с моделями, а миграция - нет.
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    TitleStats = apps.get_model('reviews', 'TitleStats')
+    stats = {
+        title_id: TitleStats(title_id=title_id)
+        for title_id in Title.objects.values_list('pk', flat=True)
+    }
+    for row in Review.objects.filter(title_id__isnull=False).order_by().values(
+        'title_id', 'score'
+    ).annotate(count=Count('id'), last=Max('pub_date')):
+        title_stats = stats[row['title_id']]
+        setattr(title_stats, f'score_{row["score"]}', row['count'])
+        title_stats.review_count += row['count']
+        if (
+            title_stats.last_review_at is None
+            or title_stats.last_review_at < row['last']
+        ):
+            title_stats.last_review_at = row['last']
+    for row in Comment.objects.filter(
+        review__title_id__isnull=False
+    ).order_by().values('review__title_id').annotate(count=Count('id')):
+        stats[row['review__title_id']].comment_count = row['count']
+    TitleStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_ranking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.title')),
+                ('score_1', models.PositiveIntegerField(default=0)),
+                ('score_2', models.PositiveIntegerField(default=0)),
+                ('score_3', models.PositiveIntegerField(default=0)),
+                ('score_4', models.PositiveIntegerField(default=0)),
+                ('score_5', models.PositiveIntegerField(default=0)),
+                ('score_6', models.PositiveIntegerField(default=0)),
+                ('score_7', models.PositiveIntegerField(default=0)),
+                ('score_8', models.PositiveIntegerField(default=0)),
+                ('score_9', models.PositiveIntegerField(default=0)),
+                ('score_10', models.PositiveIntegerField(default=0)),
+                ('review_count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Количество комментариев')),
+                ('last_review_at', models.DateTimeField(null=True, verbose_name='Дата последнего отзыва')),
+            ],
+            options={
+                'verbose_name': 'Статистика произведения',
+                'verbose_name_plural': 'Статистика произведений',
+            },
+        ),
+        migrations.RunPython(fill_title_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='category_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='reviews.category'),
+        ),
+    ]
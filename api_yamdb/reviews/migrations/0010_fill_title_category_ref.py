@@ -0,0 +1,42 @@
+from django.db import migrations, transaction
+from django.db.models import OuterRef, Subquery
+
+BATCH_SIZE = 5000
+
+
+def fill_category_ref(apps, schema_editor):
+    """
+    Переносит категории со слагов на id пачками по BATCH_SIZE
+    произведений, каждая пачка - в своей транзакции.
+    """
+    Title = apps.get_model('reviews', 'Title')
+    Category = apps.get_model('reviews', 'Category')
+    category_id = Subquery(
+        Category.objects.filter(slug=OuterRef('category_id')).values('pk')[:1]
+    )
+    last_pk = 0
+    while True:
+        pks = list(
+            Title.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:BATCH_SIZE]
+        )
+        if not pks:
+            return
+        with transaction.atomic():
+            Title.objects.filter(pk__gte=pks[0], pk__lte=pks[-1]).update(
+                category_ref=category_id
+            )
+        last_pk = pks[-1]
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('reviews', '0009_title_category_ref'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_category_ref, migrations.RunPython.noop),
+    ]
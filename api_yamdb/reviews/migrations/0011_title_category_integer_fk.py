@@ -0,0 +1,37 @@
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import OuterRef, Subquery
+
+
+def fill_category_slugs(apps, schema_editor):
+    """Обратный перенос: слаги категорий по новому внешнему ключу."""
+    Title = apps.get_model('reviews', 'Title')
+    Category = apps.get_model('reviews', 'Category')
+    Title.objects.update(category=Subquery(
+        Category.objects.filter(pk=OuterRef('category_ref')).values('slug')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_fill_title_category_ref'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, fill_category_slugs),
+        migrations.RemoveField(
+            model_name='title',
+            name='category',
+        ),
+        migrations.RenameField(
+            model_name='title',
+            old_name='category_ref',
+            new_name='category',
+        ),
+        migrations.AlterField(
+            model_name='title',
+            name='category',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='reviews.category', verbose_name='Категория'),
+        ),
+    ]
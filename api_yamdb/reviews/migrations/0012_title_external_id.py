@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_title_category_integer_fk'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='external_id',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True, verbose_name='Внешний идентификатор'),
+        ),
+    ]
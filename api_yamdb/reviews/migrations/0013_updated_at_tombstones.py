@@ -0,0 +1,49 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_title_external_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=16, verbose_name='Модель')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Идентификатор')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата удаления')),
+            ],
+            options={
+                'verbose_name': 'Удалённый объект',
+                'verbose_name_plural': 'Удалённые объекты',
+            },
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Дата изменения'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 3.2 on 2026-10-18 18:50
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import (ExpressionWrapper, F, FloatField, OuterRef,
+                              Subquery, Sum, Value)
+
+
+def rescore_rankings(apps, schema_editor):
+    # Строки, посчитанные с разными средними, пересчитываются с одной.
+    Title = apps.get_model('reviews', 'Title')
+    TitleRanking = apps.get_model('reviews', 'TitleRanking')
+    totals = Title.objects.aggregate(
+        total=Sum('score_sum'), count=Sum('score_count')
+    )
+    mean = totals['total'] / totals['count'] if totals['count'] else 0
+    weight = getattr(settings, 'RANKING_PRIOR_WEIGHT', 10)
+    score = Title.objects.filter(
+        pk=OuterRef('title_id'), score_count__gt=0
+    ).annotate(
+        bayesian_score=ExpressionWrapper(
+            (Value(float(weight * mean)) + F('score_sum'))
+            / (Value(weight) + F('score_count')),
+            output_field=FloatField(),
+        )
+    ).values('bayesian_score')
+    TitleRanking.objects.update(score=Subquery(score), prior_mean=mean)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_updated_at_tombstones'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='titleranking',
+            name='prior_mean',
+            field=models.FloatField(null=True, verbose_name='Средняя оценка каталога'),
+        ),
+        migrations.RunPython(rescore_rankings, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -12,6 +13,9 @@ class Category(models.Model):
                             verbose_name='Название категории')
     slug = models.SlugField(max_length=50,
                             unique=True)
+    updated_at = models.DateTimeField(auto_now=True,
+                                      db_index=True,
+                                      verbose_name='Дата изменения')
 
     def __str__(self):
         return self.name
@@ -28,6 +32,9 @@ class Genre(models.Model):
                             verbose_name='Название жанра')
     slug = models.SlugField(max_length=50,
                             unique=True)
+    updated_at = models.DateTimeField(auto_now=True,
+                                      db_index=True,
+                                      verbose_name='Дата изменения')
 
     def __str__(self):
         return self.name
@@ -42,18 +49,32 @@ class Title(models.Model):
                             verbose_name='Название произведения',
                             blank=False)
     year = models.IntegerField(blank=False,
+                               db_index=True,
                                verbose_name='Год создания')
     rating = models.IntegerField(verbose_name='Рейтинг произведения',
                                  blank=True,
                                  null=True)
+    score_sum = models.PositiveIntegerField(verbose_name='Сумма оценок',
+                                            default=0,
+                                            editable=False)
+    score_count = models.PositiveIntegerField(verbose_name='Количество оценок',
+                                              default=0,
+                                              editable=False)
     description = models.TextField(verbose_name='Описание произведения')
     genre = models.ManyToManyField(Genre, through='TitleGenre')
     category = models.ForeignKey(Category,
-                                 to_field='slug',
                                  on_delete=models.SET_NULL,
                                  blank=False,
                                  null=True,
                                  verbose_name='Категория')
+    external_id = models.CharField(max_length=64,
+                                   unique=True,
+                                   blank=True,
+                                   null=True,
+                                   verbose_name='Внешний идентификатор')
+    updated_at = models.DateTimeField(auto_now=True,
+                                      db_index=True,
+                                      verbose_name='Дата изменения')
 
     def __str__(self):
         return self.name
@@ -71,6 +92,85 @@ class TitleGenre(models.Model):
         return f'{self.title} {self.genre}'
 
 
+class TitleStats(models.Model):
+    """
+    Распределение оценок и счётчики отзывов и комментариев произведения,
+    которые обновляются при записи отзывов и комментариев.
+    """
+    title = models.OneToOneField(Title,
+                                 on_delete=models.CASCADE,
+                                 primary_key=True,
+                                 related_name='stats')
+    score_1 = models.PositiveIntegerField(default=0)
+    score_2 = models.PositiveIntegerField(default=0)
+    score_3 = models.PositiveIntegerField(default=0)
+    score_4 = models.PositiveIntegerField(default=0)
+    score_5 = models.PositiveIntegerField(default=0)
+    score_6 = models.PositiveIntegerField(default=0)
+    score_7 = models.PositiveIntegerField(default=0)
+    score_8 = models.PositiveIntegerField(default=0)
+    score_9 = models.PositiveIntegerField(default=0)
+    score_10 = models.PositiveIntegerField(default=0)
+    review_count = models.PositiveIntegerField(
+        default=0, verbose_name='Количество отзывов'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0, verbose_name='Количество комментариев'
+    )
+    last_review_at = models.DateTimeField(
+        null=True, verbose_name='Дата последнего отзыва'
+    )
+
+    def __str__(self):
+        return str(self.title)
+
+    class Meta:
+        verbose_name = 'Статистика произведения'
+        verbose_name_plural = 'Статистика произведений'
+
+
+class TitleRanking(models.Model):
+    """
+    Предрасчитанное место произведения в рейтингах: общем, по категории,
+    жанру и году. На каждое произведение приходится по строке на срез.
+    """
+    ALL = 'all'
+    CATEGORY = 'category'
+    GENRE = 'genre'
+    YEAR = 'year'
+    SCOPES = (
+        (ALL, 'Все произведения'),
+        (CATEGORY, 'Категория'),
+        (GENRE, 'Жанр'),
+        (YEAR, 'Год'),
+    )
+
+    title = models.ForeignKey(Title,
+                              on_delete=models.CASCADE,
+                              related_name='rankings')
+    scope = models.CharField(max_length=16,
+                             choices=SCOPES,
+                             verbose_name='Срез')
+    key = models.CharField(max_length=50,
+                           blank=True,
+                           verbose_name='Значение среза')
+    score = models.FloatField(null=True,
+                              verbose_name='Взвешенная оценка')
+    prior_mean = models.FloatField(null=True,
+                                   verbose_name='Средняя оценка каталога')
+
+    def __str__(self):
+        return f'{self.title} {self.scope} {self.key}'
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Рейтинги произведений'
+        indexes = [
+            models.Index(fields=['scope', 'key', '-score', 'title'],
+                         name='title_ranking_score_idx'),
+        ]
+
+
 class Review(models.Model):
     author = models.ForeignKey(
         User, on_delete=models.CASCADE,
@@ -91,7 +191,11 @@ class Review(models.Model):
     )
     text = models.TextField('Текст', help_text='Отзыв')
     pub_date = models.DateTimeField(
-        'Дата публикации', auto_now_add=True, db_index=True
+        'Дата публикации', default=timezone.now, editable=False,
+        db_index=True
+    )
+    updated_at = models.DateTimeField(
+        'Дата изменения', auto_now=True, db_index=True
     )
 
     class Meta:
@@ -102,9 +206,21 @@ class Review(models.Model):
                 name='unique_author_title'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx'
+            )
+        ]
         verbose_name = 'Отзыв',
         verbose_name_plural = 'Отзывы'
 
+    def save(self, *args, **kwargs):
+        # Счётчики рейтинга обновляются в post_save, поэтому запись отзыва
+        # и изменение рейтинга выполняются в одной транзакции.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return '"{}" - отзыв на "{}" Автор: "{}"'.format(
             self.text,
@@ -122,11 +238,21 @@ class Comment(models.Model):
     )
     text = models.TextField('Текст', help_text='Комментарий')
     pub_date = models.DateTimeField(
-        'Дата публикации', auto_now_add=True, db_index=True
+        'Дата публикации', default=timezone.now, editable=False,
+        db_index=True
+    )
+    updated_at = models.DateTimeField(
+        'Дата изменения', auto_now=True, db_index=True
     )
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', '-id'],
+                name='comment_review_pub_date_idx'
+            )
+        ]
         verbose_name = 'Комментарий',
         verbose_name_plural = 'Комментарии'
 
@@ -136,3 +262,22 @@ class Comment(models.Model):
             self.review,
             self.author
         )
+
+
+class Tombstone(models.Model):
+    """
+    Отметка об удалении произведения, жанра, категории, отзыва или
+    комментария: по ней клиенты ленты изменений удаляют свои копии.
+    """
+    model = models.CharField(max_length=16, verbose_name='Модель')
+    object_id = models.PositiveIntegerField(verbose_name='Идентификатор')
+    deleted_at = models.DateTimeField(auto_now_add=True,
+                                      db_index=True,
+                                      verbose_name='Дата удаления')
+
+    def __str__(self):
+        return f'{self.model} {self.object_id}'
+
+    class Meta:
+        verbose_name = 'Удалённый объект'
+        verbose_name_plural = 'Удалённые объекты'
@@ -0,0 +1,156 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (ExpressionWrapper, F, FloatField, OuterRef,
+                              Subquery, Sum, Value)
+
+from reviews.models import Title, TitleGenre, TitleRanking
+
+TITLE_RANKING_FIELDS = (
+    'pk', 'category__slug', 'year', 'score_sum', 'score_count'
+)
+
+
+def get_prior_weight():
+    return getattr(settings, 'RANKING_PRIOR_WEIGHT', 10)
+
+
+def compute_prior_mean(title_model=Title):
+    """Средняя оценка по всем отзывам каталога."""
+    totals = title_model.objects.aggregate(
+        total=Sum('score_sum'), count=Sum('score_count')
+    )
+    return totals['total'] / totals['count'] if totals['count'] else 0
+
+
+def get_prior_mean():
+    """
+    Средняя, с которой посчитаны сохранённые рейтинги: новые строки
+    считаются с ней же, чтобы все оценки были сравнимы. Меняет её только
+    полная пересборка rebuild_rankings.
+    """
+    mean = TitleRanking.objects.filter(
+        prior_mean__isnull=False
+    ).values_list('prior_mean', flat=True).first()
+    if mean is None:
+        mean = compute_prior_mean()
+    return mean
+
+
+def bayesian_score(score_sum, score_count, mean, weight):
+    """
+    Оценка, притянутая к средней по каталогу: у произведения с парой
+    отзывов она близка к средней, с множеством - к собственной.
+    """
+    if not score_count:
+        return None
+    return (weight * mean + score_sum) / (weight + score_count)
+
+
+def build_title_rankings(ranking_model, title, genre_slugs, mean, weight):
+    pk, category_slug, year, score_sum, score_count = title
+    score = bayesian_score(score_sum, score_count, mean, weight)
+    keys = [(TitleRanking.ALL, ''), (TitleRanking.YEAR, str(year))]
+    if category_slug is not None:
+        keys.append((TitleRanking.CATEGORY, category_slug))
+    keys.extend((TitleRanking.GENRE, slug) for slug in genre_slugs)
+    return [
+        ranking_model(
+            title_id=pk, scope=scope, key=key, score=score, prior_mean=mean
+        )
+        for scope, key in keys
+    ]
+
+
+def get_genre_slugs(title_genre_model, title_ids):
+    genre_slugs = {}
+    for title_id, slug in title_genre_model.objects.filter(
+        title_id__in=title_ids
+    ).values_list('title_id', 'genre__slug'):
+        genre_slugs.setdefault(title_id, []).append(slug)
+    return genre_slugs
+
+
+def refresh_title_ranking(title_id):
+    """Пересобирает строки рейтингов одного произведения."""
+    refresh_title_rankings([title_id])
+
+
+def refresh_title_rankings(title_ids):
+    """Пересобирает строки рейтингов произведений title_ids пачкой."""
+    titles = list(Title.objects.filter(pk__in=title_ids).values_list(
+        *TITLE_RANKING_FIELDS
+    ))
+    with transaction.atomic():
+        TitleRanking.objects.filter(title_id__in=title_ids).delete()
+        if not titles:
+            return
+        genre_slugs = get_genre_slugs(TitleGenre, title_ids)
+        mean = get_prior_mean()
+        weight = get_prior_weight()
+        rankings = []
+        for title in titles:
+            rankings.extend(build_title_rankings(
+                TitleRanking,
+                title, genre_slugs.get(title[0], []), mean, weight
+            ))
+        TitleRanking.objects.bulk_create(rankings)
+
+
+def update_title_score(title_id):
+    """
+    Обновляет оценку произведения во всех срезах одним UPDATE: она
+    считается по счётчикам произведения в подзапросе, как bayesian_score,
+    со средней, сохранённой в самой строке рейтинга.
+    """
+    weight = get_prior_weight()
+    score = Title.objects.filter(pk=title_id, score_count__gt=0).annotate(
+        bayesian_score=ExpressionWrapper(
+            (Value(float(weight)) * OuterRef('prior_mean') + F('score_sum'))
+            / (Value(weight) + F('score_count')),
+            output_field=FloatField(),
+        )
+    ).values('bayesian_score')
+    TitleRanking.objects.filter(title_id=title_id).update(
+        score=Subquery(score)
+    )
+
+
+def rebuild_rankings(title_model, title_genre_model, ranking_model,
+                     batch_size=1000):
+    """
+    Полностью пересобирает рейтинги пачками по batch_size произведений
+    и заново считает среднюю оценку каталога. Возвращает число строк.
+    """
+    mean = compute_prior_mean(title_model)
+    weight = get_prior_weight()
+    created = 0
+    last_pk = 0
+    with transaction.atomic():
+        ranking_model.objects.all().delete()
+        while True:
+            titles = list(
+                title_model.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list(*TITLE_RANKING_FIELDS)[:batch_size]
+            )
+            if not titles:
+                return created
+            last_pk = titles[-1][0]
+            genre_slugs = get_genre_slugs(
+                title_genre_model, [title[0] for title in titles]
+            )
+            rankings = []
+            for title in titles:
+                rankings.extend(build_title_rankings(
+                    ranking_model,
+                    title, genre_slugs.get(title[0], []), mean, weight
+                ))
+            ranking_model.objects.bulk_create(rankings, batch_size)
+            created += len(rankings)
+
+
+def rename_ranking_key(scope, old_key, new_key):
+    if old_key != new_key:
+        TitleRanking.objects.filter(scope=scope, key=old_key).update(
+            key=new_key
+        )
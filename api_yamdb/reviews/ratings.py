@@ -0,0 +1,86 @@
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Sum, When
+from django.dispatch import Signal
+from django.utils import timezone
+
+from reviews.models import Title
+
+RATING_FIELDS = ('score_sum', 'score_count', 'rating')
+
+title_rating_changed = Signal()
+
+
+def update_title_rating(title_id, score_delta, count_delta):
+    """
+    Сдвигает сумму и количество оценок произведения. Сначала пробует
+    UPDATE при условии, что целый рейтинг не меняется, и только если он
+    не сработал, выполняет безусловный: так без SELECT известно, нужно ли
+    сбрасывать кеш списков, где виден рейтинг.
+    """
+    if title_id is None:
+        return
+    new_sum = F('score_sum') + score_delta
+    new_count = F('score_count') + count_delta
+    new_rating = Case(
+        When(score_count=-count_delta, then=None),
+        default=new_sum / new_count,
+        output_field=IntegerField(),
+    )
+    titles = Title.objects.filter(pk=title_id)
+    changes = {
+        'updated_at': timezone.now(),
+        'score_sum': new_sum,
+        'score_count': new_count,
+        'rating': new_rating,
+    }
+    rating_changed = not titles.filter(rating=new_rating).update(**changes)
+    if rating_changed:
+        titles.update(**changes)
+    title_rating_changed.send(
+        sender=Title, title_id=title_id, rating_changed=rating_changed
+    )
+
+
+def recompute_ratings(title_model, review_model, batch_size=1000):
+    """
+    Пересчитывает счётчики рейтинга по таблице отзывов пачками по
+    batch_size произведений. Возвращает количество исправленных записей.
+    """
+    fixed = 0
+    last_pk = 0
+    while True:
+        titles = list(
+            title_model.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .only(*RATING_FIELDS)[:batch_size]
+        )
+        if not titles:
+            return fixed
+        last_pk = titles[-1].pk
+        totals = {
+            row['title_id']: row
+            for row in review_model.objects.filter(
+                title_id__in=[title.pk for title in titles]
+            ).order_by().values('title_id').annotate(
+                total=Sum('score'), count=Count('id')
+            )
+        }
+        changed = []
+        now = timezone.now()
+        for title in titles:
+            row = totals.get(title.pk, {'total': 0, 'count': 0})
+            rating = row['total'] // row['count'] if row['count'] else None
+            if (title.score_sum, title.score_count, title.rating) != (
+                row['total'], row['count'], rating
+            ):
+                title.score_sum = row['total']
+                title.score_count = row['count']
+                title.rating = rating
+                # bulk_update не заполняет поля auto_now.
+                title.updated_at = now
+                changed.append(title)
+        with transaction.atomic():
+            title_model.objects.bulk_update(
+                changed, (*RATING_FIELDS, 'updated_at')
+            )
+        fixed += len(changed)
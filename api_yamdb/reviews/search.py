@@ -0,0 +1,196 @@
+import math
+import re
+
+from django.db import connections
+from django.db.models import Case, FloatField, Value, When
+from django.db.models.expressions import RawSQL
+
+WORD_RE = re.compile(r'\w+')
+TRIGRAM_LENGTH = 3
+
+SQLITE_TRIGGERS_SQL = (
+    "CREATE TRIGGER reviews_title_search_insert AFTER INSERT ON reviews_title "
+    "BEGIN "
+    "INSERT INTO reviews_title_search(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); "
+    "END",
+    "CREATE TRIGGER reviews_title_search_delete AFTER DELETE ON reviews_title "
+    "BEGIN "
+    "INSERT INTO reviews_title_search(reviews_title_search, rowid, name, "
+    "description) VALUES ('delete', old.id, old.name, old.description); "
+    "END",
+    "CREATE TRIGGER reviews_title_search_update "
+    "AFTER UPDATE OF name, description ON reviews_title "
+    "BEGIN "
+    "INSERT INTO reviews_title_search(reviews_title_search, rowid, name, "
+    "description) VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO reviews_title_search(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); "
+    "END",
+)
+SQLITE_TRIGGER_NAMES = (
+    'reviews_title_search_insert',
+    'reviews_title_search_delete',
+    'reviews_title_search_update',
+)
+SQLITE_DROP_TRIGGERS_SQL = tuple(
+    f'DROP TRIGGER IF EXISTS {name}' for name in SQLITE_TRIGGER_NAMES
+)
+
+
+def ensure_search_triggers(using, **kwargs):
+    """
+    Обработчик post_migrate: если миграция пересоздала reviews_title и
+    триггеры пропали, создаёт их заново и перестраивает индекс, который
+    мог пропустить изменения, сделанные без триггеров.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT name FROM sqlite_master '
+            "WHERE name = 'reviews_title_search' "
+            "OR (type = 'trigger' AND tbl_name = 'reviews_title')"
+        )
+        found = {name for name, in cursor.fetchall()}
+        if 'reviews_title_search' not in found or found.issuperset(
+            SQLITE_TRIGGER_NAMES
+        ):
+            return
+        for sql in (
+            *SQLITE_DROP_TRIGGERS_SQL,
+            *SQLITE_TRIGGERS_SQL,
+            "INSERT INTO reviews_title_search(reviews_title_search) "
+            "VALUES ('rebuild')",
+        ):
+            cursor.execute(sql)
+
+
+def trigrams(word):
+    return {
+        word[start:start + TRIGRAM_LENGTH]
+        for start in range(len(word) - TRIGRAM_LENGTH + 1)
+    }
+
+
+class SQLiteTitleSearch:
+    """
+    FTS5 с триграммным токенизатором: сначала ищутся произведения,
+    содержащие все слова запроса как подстроки (в том числе префиксы),
+    и сортируются по bm25, где название весит больше описания. Если среди
+    отобранных фильтрами таких нет, ищутся произведения с долей общих
+    триграмм не меньше FUZZY_MIN_OVERLAP, что прощает опечатки.
+    """
+    FUZZY_MIN_OVERLAP = 1 / 3
+    FUZZY_LIMIT = 100
+
+    # Индекс присоединяется к reviews_title один раз: bm25 считается для
+    # найденных строк в том же запросе, без подзапроса на каждую строку.
+    match_tables = ['reviews_title_search']
+    match_where = [
+        'reviews_title_search.rowid = reviews_title.id',
+        'reviews_title_search MATCH %s',
+    ]
+    rank_sql = '-bm25(reviews_title_search, 10.0, 1.0)'
+    trigram_sql = (
+        'SELECT rowid FROM reviews_title_search '
+        'WHERE reviews_title_search MATCH %s'
+    )
+
+    def search(self, queryset, words):
+        words = [word for word in words if len(word) >= TRIGRAM_LENGTH]
+        if not words:
+            return None
+        exact = queryset.extra(
+            tables=self.match_tables,
+            where=self.match_where,
+            params=[' AND '.join(f'"{word}"' for word in words)],
+        ).annotate(search_rank=RawSQL(self.rank_sql, (), FloatField()))
+        if exact.exists():
+            return exact
+        overlaps = self.get_fuzzy_overlaps(
+            queryset, sorted(set().union(*map(trigrams, words)))
+        )
+        return queryset.filter(id__in=overlaps).annotate(search_rank=Case(
+            *(When(id=pk, then=Value(overlap))
+              for pk, overlap in overlaps.items()),
+            output_field=FloatField(),
+        ))
+
+    def get_fuzzy_overlaps(self, queryset, grams):
+        """
+        Возвращает до FUZZY_LIMIT произведений из queryset с наибольшим
+        числом общих с запросом триграмм: каждая триграмма читается из
+        индекса один раз.
+        """
+        sql = (
+            'SELECT rowid, COUNT(*) AS overlap FROM ('
+            + ' UNION ALL '.join([self.trigram_sql] * len(grams))
+            + ')'
+        )
+        params = [f'"{gram}"' for gram in grams]
+        if queryset.query.has_filters():
+            ids_sql, ids_params = queryset.order_by().values(
+                'id'
+            ).query.sql_with_params()
+            sql += f' WHERE rowid IN ({ids_sql})'
+            params.extend(ids_params)
+        sql += (
+            ' GROUP BY rowid HAVING overlap >= %s '
+            'ORDER BY overlap DESC, rowid LIMIT %s'
+        )
+        params.extend((
+            max(1, math.ceil(len(grams) * self.FUZZY_MIN_OVERLAP)),
+            self.FUZZY_LIMIT,
+        ))
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(sql, params)
+            return dict(cursor.fetchall())
+
+
+class PostgreSQLTitleSearch:
+    """
+    Полнотекстовый поиск по префиксам слов через tsvector/GIN и нечёткое
+    совпадение названия через pg_trgm.
+    """
+    match_sql = (
+        'SELECT id FROM reviews_title '
+        "WHERE search_vector @@ to_tsquery('simple', %s) "
+        'OR %s <%% name'
+    )
+    rank_sql = (
+        "ts_rank(reviews_title.search_vector, to_tsquery('simple', %s)) "
+        '+ word_similarity(%s, reviews_title.name)'
+    )
+
+    def search(self, queryset, words):
+        tsquery = ' & '.join(f'{word}:*' for word in words)
+        phrase = ' '.join(words)
+        return queryset.filter(
+            id__in=RawSQL(self.match_sql, (tsquery, phrase))
+        ).annotate(
+            search_rank=RawSQL(self.rank_sql, (tsquery, phrase), FloatField())
+        )
+
+
+SEARCH_BACKENDS = {
+    'sqlite': SQLiteTitleSearch,
+    'postgresql': PostgreSQLTitleSearch,
+}
+
+
+def search_titles(queryset, query):
+    """
+    Отбирает из queryset произведения по поисковому запросу и сортирует
+    их по релевантности. На СУБД без поискового индекса, а также для
+    слишком коротких запросов ищет подстроку в названии.
+    """
+    words = [word.lower() for word in WORD_RE.findall(query)]
+    if not words:
+        return queryset.none()
+    backend = SEARCH_BACKENDS.get(connections[queryset.db].vendor)
+    found = backend().search(queryset, words) if backend else None
+    if found is None:
+        return queryset.filter(name__icontains=query.strip())
+    return found.order_by('-search_rank', 'name')
@@ -0,0 +1,253 @@
+import threading
+
+from django.core.signals import request_started
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_save, pre_delete)
+from django.db import transaction
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleGenre, TitleRanking, TitleStats, Tombstone)
+from reviews.rankings import (refresh_title_ranking, refresh_title_rankings,
+                              rename_ranking_key, update_title_score)
+from reviews.ratings import title_rating_changed, update_title_rating
+from reviews.stats import update_comment_count, update_title_stats
+
+RANKING_SCOPES = {
+    Category: TitleRanking.CATEGORY,
+    Genre: TitleRanking.GENRE,
+}
+
+# Отправляется после массовой загрузки, минующей сигналы моделей.
+catalogue_imported = Signal()
+# Отправляется после пакетной записи произведений с их идентификаторами.
+titles_bulk_saved = Signal()
+
+
+class Deletion(threading.local):
+    """
+    Объекты, которые удаляет один вызов delete() вместе с каскадом.
+    Django отправляет pre_delete для всех собранных объектов раньше
+    первого post_delete, поэтому удаление закончено, когда post_delete
+    пришёл для каждого из них.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.pending = set()
+        self.title_ids = set()
+        self.review_titles = {}
+        self.tombstones = []
+        self.deleting = False
+
+    def collect(self, sender, instance):
+        if self.deleting:
+            # Предыдущее удаление прервалось ошибкой.
+            self.reset()
+        self.pending.add((sender, instance.pk))
+        if sender is Title:
+            self.title_ids.add(instance.pk)
+        elif sender is Review:
+            self.review_titles[instance.pk] = instance.title_id
+
+    def includes_review(self, review_id):
+        return review_id in self.review_titles
+
+    def includes_title(self, title_id=None, review_id=None):
+        if review_id is not None:
+            title_id = self.review_titles.get(review_id)
+        return title_id is not None and title_id in self.title_ids
+
+    def deleted(self, sender, instance):
+        """Запоминает удалённый объект; True, если удаление закончено."""
+        self.deleting = True
+        self.pending.discard((sender, instance.pk))
+        self.tombstones.append(Tombstone(
+            model=sender._meta.model_name, object_id=instance.pk
+        ))
+        return not self.pending
+
+
+deletion = Deletion()
+
+
+@receiver(request_started)
+def reset_deletion(sender, **kwargs):
+    deletion.reset()
+
+
+@receiver(pre_delete, sender=Title)
+@receiver(pre_delete, sender=Genre)
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Review)
+@receiver(pre_delete, sender=Comment)
+def collect_deleted(sender, instance, **kwargs):
+    deletion.collect(sender, instance)
+
+
+@receiver(post_init, sender=Review)
+def remember_review_score(sender, instance, **kwargs):
+    instance._saved_score = instance.score
+    instance._saved_title_id = instance.title_id
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    if created:
+        update_title_rating(instance.title_id, instance.score, 1)
+        update_title_stats(
+            instance.title_id,
+            added_score=instance.score,
+            pub_date=instance.pub_date
+        )
+    elif instance._saved_title_id != instance.title_id:
+        update_title_rating(
+            instance._saved_title_id, -instance._saved_score, -1
+        )
+        update_title_stats(
+            instance._saved_title_id, removed_score=instance._saved_score
+        )
+        update_title_rating(instance.title_id, instance.score, 1)
+        update_title_stats(
+            instance.title_id,
+            added_score=instance.score,
+            pub_date=instance.pub_date
+        )
+    elif instance._saved_score != instance.score:
+        update_title_rating(
+            instance.title_id, instance.score - instance._saved_score, 0
+        )
+        update_title_stats(
+            instance.title_id,
+            added_score=instance.score,
+            removed_score=instance._saved_score
+        )
+    remember_review_score(sender, instance)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    # Счётчики удаляемого вместе с отзывами произведения не нужны.
+    if deletion.includes_title(instance.title_id):
+        return
+    update_title_rating(instance.title_id, -instance._saved_score, -1)
+    update_title_stats(
+        instance.title_id, removed_score=instance._saved_score
+    )
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        update_comment_count(instance.review_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    if deletion.includes_title(review_id=instance.review_id):
+        return
+    update_comment_count(instance.review_id, -1)
+
+
+def touch_titles(queryset):
+    # Жанры и категория входят в представление произведения, поэтому их
+    # изменение должно попасть в ленту изменений и для произведений.
+    queryset.update(updated_at=timezone.now())
+
+
+@receiver(title_rating_changed)
+def title_score_changed(sender, title_id, **kwargs):
+    update_title_score(title_id)
+
+
+def schedule_ranking_refresh(title_id):
+    # После коммита: пересборка видит итоговые категорию и жанры, а при
+    # удалении произведения не создаёт строк для удаляемой записи.
+    transaction.on_commit(lambda: refresh_title_ranking(title_id))
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, created, **kwargs):
+    if created:
+        TitleStats.objects.create(title=instance)
+    schedule_ranking_refresh(instance.pk)
+
+
+@receiver(titles_bulk_saved)
+def titles_bulk_changed(sender, title_ids, **kwargs):
+    transaction.on_commit(lambda: refresh_title_rankings(title_ids))
+
+
+# Связи с жанрами меняются только через Title.genre, поэтому достаточно
+# m2m_changed: без обработчиков post_delete удаление связей не построчное.
+@receiver(m2m_changed, sender=TitleGenre)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if reverse and action == 'pre_clear':
+        touch_titles(Title.objects.filter(genre=instance))
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        touch_titles(Title.objects.filter(pk=instance.pk))
+        schedule_ranking_refresh(instance.pk)
+    elif action == 'post_clear':
+        TitleRanking.objects.filter(
+            scope=TitleRanking.GENRE, key=instance.slug
+        ).delete()
+    else:
+        touch_titles(Title.objects.filter(pk__in=pk_set))
+        for title_id in pk_set:
+            schedule_ranking_refresh(title_id)
+
+
+@receiver(post_init, sender=Genre)
+@receiver(post_init, sender=Category)
+def remember_slug(sender, instance, **kwargs):
+    instance._saved_slug = instance.slug
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+def slug_changed(sender, instance, created, **kwargs):
+    if not created:
+        rename_ranking_key(
+            RANKING_SCOPES[sender], instance._saved_slug, instance.slug
+        )
+        touch_titles(get_related_titles(sender, instance))
+    remember_slug(sender, instance)
+
+
+def get_related_titles(sender, instance):
+    if sender is Genre:
+        return Title.objects.filter(genre=instance)
+    return Title.objects.filter(category=instance)
+
+
+@receiver(pre_delete, sender=Genre)
+@receiver(pre_delete, sender=Category)
+def slug_deleting(sender, instance, **kwargs):
+    touch_titles(get_related_titles(sender, instance))
+
+
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+def slug_deleted(sender, instance, **kwargs):
+    TitleRanking.objects.filter(
+        scope=RANKING_SCOPES[sender], key=instance.slug
+    ).delete()
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def record_tombstone(sender, instance, **kwargs):
+    # Отметки всего каскада пишутся одним INSERT после последнего
+    # удалённого объекта.
+    if deletion.deleted(sender, instance):
+        Tombstone.objects.bulk_create(deletion.tombstones)
+        deletion.reset()
@@ -0,0 +1,126 @@
+from django.db import transaction
+from django.db.models import (Case, Count, F, Max, OuterRef, Subquery,
+                              Value, When)
+
+from reviews.models import Comment, Review, Title, TitleStats
+
+SCORE_FIELDS = tuple(f'score_{score}' for score in range(1, 11))
+STATS_FIELDS = (
+    *SCORE_FIELDS, 'review_count', 'comment_count', 'last_review_at'
+)
+
+
+def update_title_stats(title_id, added_score=None, removed_score=None,
+                       pub_date=None):
+    """
+    Сдвигает счётчики оценок одним UPDATE. Если записи статистики нет,
+    после коммита она собирается заново по отзывам.
+    """
+    if title_id is None:
+        return
+    deltas = {}
+    if added_score is not None:
+        deltas[f'score_{added_score}'] = 1
+    if removed_score is not None:
+        field = f'score_{removed_score}'
+        deltas[field] = deltas.get(field, 0) - 1
+    changes = {
+        field: F(field) + delta for field, delta in deltas.items() if delta
+    }
+    count_delta = (added_score is not None) - (removed_score is not None)
+    if count_delta:
+        changes['review_count'] = F('review_count') + count_delta
+    if removed_score is not None:
+        changes['last_review_at'] = Subquery(
+            Review.objects.filter(title_id=OuterRef('title_id'))
+            .order_by('-pub_date').values('pub_date')[:1]
+        )
+    elif pub_date is not None:
+        changes['last_review_at'] = Case(
+            When(last_review_at__gte=pub_date, then=F('last_review_at')),
+            default=Value(pub_date),
+        )
+    if not changes:
+        return
+    if not TitleStats.objects.filter(title_id=title_id).update(**changes):
+        transaction.on_commit(lambda: refresh_title_stats(title_id))
+
+
+def update_comment_count(review_id, delta):
+    """
+    Сдвигает счётчик комментариев произведения, к отзыву которого он.
+    Если записи статистики нет, после коммита она собирается заново.
+    """
+    if TitleStats.objects.filter(
+        title_id=Subquery(
+            Review.objects.filter(pk=review_id).values('title_id')[:1]
+        )
+    ).update(comment_count=F('comment_count') + delta):
+        return
+    title_id = Review.objects.filter(pk=review_id).values_list(
+        'title_id', flat=True
+    ).first()
+    if title_id is not None:
+        transaction.on_commit(lambda: refresh_title_stats(title_id))
+
+
+def collect_title_stats(stats_model, review_model, comment_model,
+                        title_ids):
+    stats = {
+        title_id: stats_model(title_id=title_id) for title_id in title_ids
+    }
+    for row in review_model.objects.filter(
+        title_id__in=title_ids
+    ).order_by().values('title_id', 'score').annotate(
+        count=Count('id'), last=Max('pub_date')
+    ):
+        title_stats = stats[row['title_id']]
+        setattr(title_stats, f'score_{row["score"]}', row['count'])
+        title_stats.review_count += row['count']
+        if (
+            title_stats.last_review_at is None
+            or title_stats.last_review_at < row['last']
+        ):
+            title_stats.last_review_at = row['last']
+    for row in comment_model.objects.filter(
+        review__title_id__in=title_ids
+    ).order_by().values('review__title_id').annotate(count=Count('id')):
+        stats[row['review__title_id']].comment_count = row['count']
+    return list(stats.values())
+
+
+def refresh_title_stats(title_id):
+    """Собирает статистику одного произведения по отзывам заново."""
+    if not Title.objects.filter(pk=title_id).exists():
+        return
+    stats, = collect_title_stats(TitleStats, Review, Comment, [title_id])
+    TitleStats.objects.update_or_create(
+        title_id=title_id,
+        defaults={field: getattr(stats, field) for field in STATS_FIELDS},
+    )
+
+
+def recompute_title_stats(title_model, review_model, comment_model,
+                          stats_model, batch_size=1000):
+    """
+    Пересобирает статистику всех произведений пачками по batch_size.
+    Возвращает количество обработанных произведений.
+    """
+    processed = 0
+    last_pk = 0
+    while True:
+        title_ids = list(
+            title_model.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not title_ids:
+            return processed
+        last_pk = title_ids[-1]
+        stats = collect_title_stats(
+            stats_model, review_model, comment_model, title_ids
+        )
+        with transaction.atomic():
+            stats_model.objects.filter(title_id__in=title_ids).delete()
+            stats_model.objects.bulk_create(stats)
+        processed += len(stats)
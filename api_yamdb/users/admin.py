@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from users.models import User
+from users.models import OutgoingEmail, User
 
 
 @admin.register(User)
@@ -19,3 +19,18 @@ class UserAdmin(admin.ModelAdmin):
     list_filter = ('username',)
     list_per_page = 10
     search_fields = ('username', 'role')
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'recipient',
+        'subject',
+        'created',
+        'attempts',
+        'sent_at'
+    )
+    list_filter = ('sent_at',)
+    list_per_page = 10
+    search_fields = ('recipient',)
@@ -0,0 +1,67 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from users.cache import user_cache
+from users.models import User, UserRolesMixin
+from users.tokens import TOKEN_VERSION_CLAIM, get_token_version
+
+
+class RoleTokenUser(UserRolesMixin, TokenUser):
+    """Пользователь, восстановленный из утверждений RoleAccessToken."""
+
+
+class RoleJWTAuthentication(JWTAuthentication):
+    """
+    Не загружает пользователя из БД, если токен выпущен RoleAccessToken:
+    роль и права берутся из токена, а актуальность подтверждает версия
+    токенов из кеша. Для токенов без версии (выданных до её появления)
+    пользователь берётся из кеша пользователей процесса.
+    """
+
+    def get_user(self, validated_token):
+        version = validated_token.get(TOKEN_VERSION_CLAIM)
+        if version is None:
+            return self.get_cached_user(validated_token)
+        user = RoleTokenUser(validated_token)
+        if get_token_version(user.id) != version:
+            raise AuthenticationFailed(
+                _('Token is invalid or expired'), code='token_not_valid'
+            )
+        return user
+
+    def get_cached_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        user = user_cache.get(user_id)
+        if user is None:
+            raise AuthenticationFailed(
+                _('User not found'), code='user_not_found'
+            )
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        return user
+
+
+def get_user_instance(user):
+    """
+    Модель пользователя для запросов, которым мало данных токена: берётся
+    из кеша пользователей процесса.
+    """
+    if isinstance(user, User):
+        return user
+    instance = user_cache.get(user.pk)
+    if instance is None:
+        raise AuthenticationFailed(
+            _('User not found'), code='user_not_found'
+        )
+    return instance
@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from users.models import User
+
+# Пароль в кеш не попадает: при сохранении такого пользователя поле
+# считается отложенным и не перезаписывается.
+CACHED_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields
+    if field.name != 'password'
+)
+
+
+class UserCache:
+    """
+    Кеш пользователей в памяти процесса с ограничением по размеру (LRU)
+    и времени жизни записей (TTL). Хранит значения полей, а не модели,
+    поэтому каждый запрос получает собственный экземпляр пользователя.
+    """
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """Пользователь по id или None, если его нет в БД."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return self._build(entry[1])
+            self.misses += 1
+        values = User.objects.filter(pk=user_id).values_list(
+            *CACHED_FIELDS
+        ).first()
+        if values is None:
+            return None
+        with self._lock:
+            self._entries[user_id] = (now + self.timeout, values)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return self._build(values)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+            }
+
+    @staticmethod
+    def _build(values):
+        return User.from_db('default', CACHED_FIELDS, values)
+
+
+user_cache = UserCache(
+    max_size=getattr(settings, 'USER_CACHE_MAX_SIZE', 1024),
+    timeout=getattr(settings, 'USER_CACHE_TIMEOUT', 60),
+)
@@ -0,0 +1,44 @@
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from users.outbox import dispatch_outbox
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails from the outbox'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Send one batch and exit instead of polling'
+        )
+        parser.add_argument('--interval', type=float, default=5)
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--max-attempts', type=int,
+            default=settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+        )
+        parser.add_argument(
+            '--retry-delay', type=float,
+            default=settings.EMAIL_OUTBOX_RETRY_DELAY
+        )
+
+    def handle(self, *args: Any, **options: Any):
+        while True:
+            sent, failed = dispatch_outbox(
+                options['batch_size'],
+                options['max_attempts'],
+                options['retry_delay']
+            )
+            if sent or failed:
+                self.stdout.write(f'Sent: {sent}, failed: {failed}')
+            if options['once']:
+                return
+            if sent + failed < options['batch_size']:
+                time.sleep(options['interval'])
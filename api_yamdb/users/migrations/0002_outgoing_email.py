@@ -0,0 +1,38 @@
+# Generated by Django 3.2 on 2026-10-18 17:51
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipient', models.EmailField(max_length=254, verbose_name='Получатель')),
+                ('subject', models.CharField(max_length=255, verbose_name='Тема')),
+                ('message', models.TextField(verbose_name='Текст')),
+                ('from_email', models.EmailField(max_length=254, verbose_name='Отправитель')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Следующая попытка')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попытки')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Отправлено')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+            ],
+            options={
+                'verbose_name': 'Исходящее письмо',
+                'verbose_name_plural': 'Исходящие письма',
+                'ordering': ('next_attempt_at',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outgoingemail',
+            index=models.Index(condition=models.Q(sent_at__isnull=True), fields=['next_attempt_at'], name='outgoing_email_pending_idx'),
+        ),
+    ]
@@ -1,11 +1,27 @@
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
 from django.db import models
+from django.utils import timezone
 
 from users.enums import UserRoles
 
 
-class User(AbstractUser):
+class UserRolesMixin:
+
+    @property
+    def is_admin(self):
+        return self.role == UserRoles.admin.name
+
+    @property
+    def is_moderator(self):
+        return self.role == UserRoles.moderator.name
+
+    @property
+    def is_user(self):
+        return self.role == UserRoles.user.name
+
+
+class User(UserRolesMixin, AbstractUser):
     username = models.CharField(
         verbose_name='Имя пользователя',
         max_length=150,
@@ -43,6 +59,15 @@ class User(AbstractUser):
         choices=UserRoles.choices(),
         default=UserRoles.user.name
     )
+    token_version = models.PositiveIntegerField(
+        verbose_name='Версия токенов',
+        default=0,
+        editable=False
+    )
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True
+    )
 
     class Meta:
         verbose_name = 'Пользователь'
@@ -58,14 +83,67 @@ class User(AbstractUser):
     def __str__(self):
         return self.username[:50]
 
-    @property
-    def is_admin(self):
-        return self.role == UserRoles.admin.name
+    def save(self, *args, **kwargs):
+        # token_version меняет только UPDATE с F() в users.signals, обычное
+        # сохранение не должно затирать его значением из памяти.
+        if (not self._state.adding and not kwargs.get('force_insert')
+                and kwargs.get('update_fields') is None):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'token_version'
+            ]
+        super().save(*args, **kwargs)
 
-    @property
-    def is_moderator(self):
-        return self.role == UserRoles.moderator.name
 
-    @property
-    def is_user(self):
-        return self.role == UserRoles.user.name
+class OutgoingEmail(models.Model):
+    recipient = models.EmailField(
+        verbose_name='Получатель',
+        max_length=254
+    )
+    subject = models.CharField(
+        verbose_name='Тема',
+        max_length=255
+    )
+    message = models.TextField(
+        verbose_name='Текст'
+    )
+    from_email = models.EmailField(
+        verbose_name='Отправитель',
+        max_length=254
+    )
+    created = models.DateTimeField(
+        verbose_name='Создано',
+        auto_now_add=True
+    )
+    next_attempt_at = models.DateTimeField(
+        verbose_name='Следующая попытка',
+        default=timezone.now
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попытки',
+        default=0
+    )
+    sent_at = models.DateTimeField(
+        verbose_name='Отправлено',
+        null=True,
+        blank=True
+    )
+    last_error = models.TextField(
+        verbose_name='Последняя ошибка',
+        blank=True
+    )
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('next_attempt_at',)
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=models.Q(sent_at__isnull=True),
+                name='outgoing_email_pending_idx'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
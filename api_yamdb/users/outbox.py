@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import OutgoingEmail
+
+
+def enqueue_email(subject, message, from_email, recipient):
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        message=message,
+        from_email=from_email,
+        recipient=recipient
+    )
+
+
+def dispatch_outbox(batch_size, max_attempts, retry_delay):
+    """
+    Отправляет пачку ожидающих писем через одно соединение с почтовым
+    сервером. Неудачные письма откладываются на retry_delay * 2^попытки
+    секунд, после max_attempts попыток больше не отправляются.
+    Возвращает количество отправленных и неотправленных писем.
+    """
+    with transaction.atomic():
+        batch = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True).filter(
+                sent_at__isnull=True,
+                next_attempt_at__lte=timezone.now(),
+                attempts__lt=max_attempts
+            ).order_by('next_attempt_at')[:batch_size]
+        )
+        if not batch:
+            return 0, 0
+        # Попытка засчитывается и следующая назначается заранее: письма
+        # остаются за этим процессом без блокировки строк, а если он
+        # упадёт во время отправки, их повторят после задержки.
+        now = timezone.now()
+        for email in batch:
+            email.attempts += 1
+            email.next_attempt_at = now + timedelta(
+                seconds=retry_delay * 2 ** (email.attempts - 1)
+            )
+        OutgoingEmail.objects.bulk_update(
+            batch, ('attempts', 'next_attempt_at')
+        )
+    # Обмен с почтовым сервером идёт уже после выхода из транзакции с
+    # блокировкой строк. Во внешней транзакции письма отправляются
+    # сразу: иначе попытка засчиталась бы без отправки.
+    return send_batch(batch)
+
+
+def send_batch(batch):
+    errors = {}
+    try:
+        with get_connection() as connection:
+            for email in batch:
+                try:
+                    connection.send_messages([EmailMessage(
+                        email.subject,
+                        email.message,
+                        email.from_email,
+                        [email.recipient]
+                    )])
+                except Exception as error:
+                    errors[email.pk] = error
+    except Exception as error:
+        errors.update((email.pk, error) for email in batch)
+
+    now = timezone.now()
+    for email in batch:
+        if email.pk in errors:
+            email.last_error = repr(errors[email.pk])
+        else:
+            email.sent_at = now
+    OutgoingEmail.objects.bulk_update(batch, ('last_error', 'sent_at'))
+    return len(batch) - len(errors), len(errors)
@@ -0,0 +1,52 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from users.cache import user_cache
+from users.models import User
+from users.tokens import (DELETED_USER_VERSION, forget_token_version,
+                          set_token_version)
+
+# Изменение этих полей отзывает выданные пользователю токены.
+TRACKED_FIELDS = ('role', 'is_staff', 'is_superuser', 'is_active')
+
+
+def get_tracked_values(instance):
+    return tuple(instance.__dict__.get(field) for field in TRACKED_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def remember_tracked_values(sender, instance, **kwargs):
+    instance._saved_tracked_values = get_tracked_values(instance)
+
+
+@receiver(pre_save, sender=User)
+def check_tracked_values(sender, instance, **kwargs):
+    instance._tracked_values_changed = (
+        instance.pk is not None
+        and instance._saved_tracked_values != get_tracked_values(instance)
+    )
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    if not created and instance._tracked_values_changed:
+        # Атомарный инкремент не теряет параллельные отзывы токенов.
+        User.objects.filter(pk=instance.pk).update(
+            token_version=F('token_version') + 1
+        )
+        instance.refresh_from_db(fields=['token_version'])
+        # Версия в памяти может отстать от параллельного отзыва, поэтому
+        # кеш не перезаписывается, а сбрасывается: следующая проверка
+        # прочитает версию из БД, когда увеличение зафиксировано.
+        transaction.on_commit(lambda: forget_token_version(instance.pk))
+    user_cache.invalidate(instance.pk)
+    remember_tracked_values(sender, instance)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+    set_token_version(instance.pk, DELETED_USER_VERSION)
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework_simplejwt.tokens import AccessToken
+
+TOKEN_CLAIMS = ('username', 'role', 'is_staff', 'is_superuser')
+TOKEN_VERSION_CLAIM = 'ver'
+DELETED_USER_VERSION = -1
+
+
+def token_version_key(user_id):
+    return f'auth:token-version:{user_id}'
+
+
+def get_token_cache():
+    return caches[getattr(settings, 'TOKEN_VERSION_CACHE_ALIAS', 'default')]
+
+
+def set_token_version(user_id, version):
+    get_token_cache().set(
+        token_version_key(user_id),
+        version,
+        getattr(settings, 'TOKEN_VERSION_CACHE_TIMEOUT', 30)
+    )
+
+
+def forget_token_version(user_id):
+    get_token_cache().delete(token_version_key(user_id))
+
+
+def get_token_version(user_id):
+    """
+    Текущая версия токенов пользователя: из кеша, а при промахе - из БД.
+    Для удалённого пользователя возвращает DELETED_USER_VERSION.
+    """
+    from users.models import User
+
+    version = get_token_cache().get(token_version_key(user_id))
+    if version is None:
+        version = User.objects.filter(pk=user_id).values_list(
+            'token_version', flat=True
+        ).first()
+        if version is None:
+            version = DELETED_USER_VERSION
+        set_token_version(user_id, version)
+    return version
+
+
+class RoleAccessToken(AccessToken):
+    """Access-токен с ролью и правами пользователя в утверждениях."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in TOKEN_CLAIMS:
+            token[claim] = getattr(user, claim)
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
@@ -0,0 +1,71 @@
+"""Синхронизация каталога: полный список против ленты изменений."""
+from utils import measure, test_database
+
+TITLES = 2000
+CHANGED = 10
+REPEAT = 50
+
+
+def main():
+    from django.core.cache import cache
+    from django.test.utils import override_settings
+    from rest_framework.test import APIClient
+
+    from reviews.models import Category, Title
+
+    client = APIClient()
+    received = {}
+
+    def full_resync():
+        url = '/api/v1/titles/'
+        pages = size = 0
+        while url:
+            response = client.get(url)
+            pages += 1
+            size += len(response.content)
+            url = response.json()['next']
+        received['full resync'] = size
+        return pages
+
+    def title_page(i):
+        cache.clear()
+        client.get('/api/v1/titles/', data={'page': i % 10 + 1})
+
+    def feed_sync(since):
+        def request(i):
+            response = client.get('/api/v1/changes/', data={'since': since})
+            received['feed sync'] = len(response.content)
+        return request
+
+    with test_database(), override_settings(CHANGES_SETTLE_TIME=0):
+        category = Category.objects.create(name='Фильм', slug='films')
+        Title.objects.bulk_create(
+            (
+                Title(name=f'Произведение {idx}', year=1900 + idx % 120,
+                      category=category, description='')
+                for idx in range(TITLES)
+            ),
+            batch_size=1000
+        )
+        since = None
+        while True:
+            data = client.get(
+                '/api/v1/changes/', data={'since': since or ''}
+            ).json()
+            since = data['cursor']
+            if data['next'] is None:
+                break
+        for title in Title.objects.order_by('?')[:CHANGED]:
+            title.name += ' (изм.)'
+            title.save()
+
+        pages = full_resync()
+        measure(f'title list page (full resync: {pages} pages)',
+                title_page, REPEAT)
+        measure(f'feed sync of {CHANGED} changes', feed_sync(since), REPEAT)
+        for name, size in received.items():
+            print(f'{name}: {size} bytes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Рендеринг страницы из 100 произведений: JSONRenderer и FastJSONRenderer."""
+import io
+
+from utils import measure, test_database
+
+PAGE_SIZE = 100
+REPEAT = 2000
+
+
+def main():
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from api.parsers import FastJSONParser
+    from api.renderers import FastJSONRenderer, orjson
+    from api.serializers import TitleReadSerializer
+    from reviews.models import Category, Genre, Title
+
+    with test_database():
+        category = Category.objects.create(name='Фильм', slug='films')
+        genres = [
+            Genre.objects.create(name=name, slug=slug)
+            for name, slug in (('Драма', 'drama'), ('Комедия', 'comedy'))
+        ]
+        for idx in range(PAGE_SIZE):
+            title = Title.objects.create(
+                name=f'Произведение номер {idx}',
+                year=1950 + idx,
+                category=category,
+                description='Описание произведения на русском языке. ' * 5,
+            )
+            title.genre.set(genres)
+        titles = Title.objects.select_related('category').prefetch_related(
+            'genre'
+        )
+        data = {
+            'count': PAGE_SIZE,
+            'next': None,
+            'previous': None,
+            'results': TitleReadSerializer(titles, many=True).data,
+        }
+        body = JSONRenderer().render(data)
+        print(f'orjson: {orjson.__version__ if orjson else "not installed"}')
+        print(f'page size: {len(body)} bytes')
+        assert FastJSONRenderer().render(data) == body
+
+        measure('render json', lambda i: JSONRenderer().render(data), REPEAT)
+        measure(
+            'render orjson', lambda i: FastJSONRenderer().render(data), REPEAT
+        )
+        measure(
+            'parse json',
+            lambda i: JSONParser().parse(io.BytesIO(body)),
+            REPEAT
+        )
+        measure(
+            'parse orjson',
+            lambda i: FastJSONParser().parse(io.BytesIO(body)),
+            REPEAT
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Списки из 100 строк: сериализаторы DRF и проекции через values_list()."""
+from utils import measure, test_database
+
+PAGE_SIZE = 100
+REPEAT = 300
+
+
+def main():
+    from api.projections import (CommentProjection, ReviewProjection,
+                                 TitleProjection)
+    from api.serializers import (CommentSerializer, ReviewSerializer,
+                                 TitleReadSerializer)
+    from reviews.models import (Category, Comment, Genre, Review, Title,
+                                TitleGenre)
+    from users.models import User
+
+    with test_database():
+        category = Category.objects.create(name='Фильм', slug='films')
+        genres = [
+            Genre.objects.create(name=name, slug=slug)
+            for name, slug in (('Драма', 'drama'), ('Комедия', 'comedy'))
+        ]
+        titles = [
+            Title.objects.create(
+                name=f'Произведение {idx}', year=2000, category=category,
+                description='Описание произведения. ' * 5
+            )
+            for idx in range(PAGE_SIZE)
+        ]
+        TitleGenre.objects.bulk_create(
+            TitleGenre(title=title, genre=genre)
+            for title in titles for genre in genres
+        )
+        users = [
+            User.objects.create(
+                username=f'user{idx}', email=f'user{idx}@yamdb.fake'
+            )
+            for idx in range(PAGE_SIZE)
+        ]
+        reviews = [
+            Review.objects.create(
+                title=titles[0], author=user, score=7,
+                text='Текст отзыва. ' * 10
+            )
+            for user in users
+        ]
+        Comment.objects.bulk_create(
+            Comment(review=reviews[0], author=user,
+                    text='Текст комментария. ' * 5)
+            for user in users
+        )
+
+        title_queryset = Title.objects.select_related(
+            'category'
+        ).prefetch_related('genre').order_by('name')
+        cases = (
+            ('titles', TitleReadSerializer, TitleProjection(),
+             title_queryset),
+            ('reviews', ReviewSerializer, ReviewProjection(),
+             Review.objects.select_related('author')),
+            ('comments', CommentSerializer, CommentProjection(),
+             Comment.objects.select_related('author')),
+        )
+        for name, serializer_class, projection, queryset in cases:
+            measure(
+                f'{name} serializer',
+                lambda i: serializer_class(queryset.all(), many=True).data,
+                REPEAT
+            )
+            measure(
+                f'{name} projection',
+                lambda i: projection.to_representation(
+                    list(projection.project(queryset.all()))
+                ),
+                REPEAT
+            )
+
+
+if __name__ == '__main__':
+    main()
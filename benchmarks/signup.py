@@ -0,0 +1,30 @@
+"""Пропускная способность POST /api/v1/auth/signup/."""
+from utils import measure, test_database
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+REPEAT = 500
+
+
+def main():
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+
+    def signup(i):
+        client.post(URL_SIGNUP, data={
+            'username': f'user{i}', 'email': f'user{i}@yamdb.fake'
+        })
+
+    def conflict(i):
+        client.post(URL_SIGNUP, data={
+            'username': f'user{i}', 'email': f'other{i}@yamdb.fake'
+        })
+
+    with test_database():
+        measure('new user', signup, REPEAT)
+        measure('existing user', signup, REPEAT)
+        measure('taken username', conflict, REPEAT)
+
+
+if __name__ == '__main__':
+    main()
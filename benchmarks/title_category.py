@@ -0,0 +1,58 @@
+"""Соединение произведений с категориями на списках и фильтрах."""
+from utils import measure, test_database
+
+TITLES = 50000
+CATEGORIES = 20
+REPEAT = 200
+
+
+def main():
+    from django.core.cache import cache
+    from rest_framework.test import APIClient
+
+    from reviews.models import Category, Title
+
+    client = APIClient()
+
+    def get(url):
+        def request(i):
+            cache.clear()
+            client.get(url)
+        return request
+
+    with test_database():
+        categories = [
+            Category.objects.create(
+                name=f'Категория {idx}', slug=f'category-number-{idx}'
+            )
+            for idx in range(CATEGORIES)
+        ]
+        Title.objects.bulk_create(
+            (
+                Title(name=f'Произведение {idx}', year=1900 + idx % 120,
+                      category=categories[idx % CATEGORIES], description='')
+                for idx in range(TITLES)
+            ),
+            batch_size=1000
+        )
+        slug = categories[3].slug
+        measure('title list page', get('/api/v1/titles/'), REPEAT)
+        measure(
+            'title list by category',
+            get(f'/api/v1/titles/?category={slug}'),
+            REPEAT
+        )
+        measure(
+            'count by category slug',
+            lambda i: Title.objects.filter(category__slug=slug).count(),
+            REPEAT
+        )
+        measure(
+            'join all titles',
+            lambda i: list(Title.objects.values_list('id', 'category__name')),
+            REPEAT // 20
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Тысячи простаивающих SSE-подключений в одном цикле событий."""
+import asyncio
+import threading
+import time
+import tracemalloc
+
+from utils import test_database
+
+CONNECTIONS = 5000
+
+
+async def open_connections(application, path, count):
+    disconnected = asyncio.Event()
+    received = [0]
+    ready = [0]
+
+    async def receive():
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        body = message.get('body', b'')
+        if body.startswith(b'retry'):
+            ready[0] += 1
+        elif body.startswith(b'event'):
+            received[0] += 1
+
+    tasks = [
+        asyncio.ensure_future(application(
+            {'type': 'http', 'method': 'GET', 'path': path,
+             'query_string': b'', 'headers': []},
+            receive, send
+        ))
+        for _ in range(count)
+    ]
+    while ready[0] < count:
+        await asyncio.sleep(0.01)
+    return tasks, disconnected, received
+
+
+async def run(application, title_id):
+    from api.events import publish_title_event
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    tasks, disconnected, received = await open_connections(
+        application, f'/api/v1/titles/{title_id}/events/', CONNECTIONS
+    )
+    opened = time.perf_counter() - started
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f'{CONNECTIONS} connections opened in {opened:.2f}s, '
+        f'{threading.active_count()} threads, '
+        f'{memory / CONNECTIONS / 1024:.1f} KiB per connection'
+    )
+
+    started = time.perf_counter()
+    publish_title_event(
+        title_id, 'review', lambda: {'id': 1, 'text': 'Отзыв'}
+    )
+    while received[0] < CONNECTIONS:
+        await asyncio.sleep(0)
+    print(
+        f'event fanned out to {CONNECTIONS} connections in '
+        f'{(time.perf_counter() - started) * 1000:.0f}ms'
+    )
+    disconnected.set()
+    await asyncio.gather(*tasks)
+
+
+def main():
+    from api_yamdb.asgi import application
+    from reviews.models import Title
+
+    with test_database():
+        title = Title.objects.create(name='Произведение', year=2000,
+                                     description='')
+        asyncio.run(run(application, title.pk))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Поиск произведений по FTS5: точные совпадения, опечатки, мусор."""
+import random
+
+from utils import measure, test_database
+
+TITLES = 50000
+REPEAT = 20
+WORDS = (
+    'alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf',
+    'hotel', 'india', 'juliett', 'kilo', 'lima', 'mike', 'november',
+    'oscar', 'papa', 'quebec', 'romeo', 'sierra', 'tango', 'uniform',
+    'victor', 'whiskey', 'xray', 'yankee', 'zulu',
+)
+QUERIES = ('alpha', 'alpha bravo', 'alpah', 'zzzqx november')
+
+
+def main():
+    from django.core.cache import cache
+    from rest_framework.test import APIClient
+
+    from reviews.models import Title
+
+    client = APIClient()
+    found = {}
+
+    def search(query):
+        def request(i):
+            cache.clear()
+            response = client.get('/api/v1/titles/', {'search': query})
+            found[query] = response.json()['count']
+        return request
+
+    rng = random.Random(0)
+    with test_database():
+        Title.objects.bulk_create(
+            (
+                Title(name=' '.join(rng.sample(WORDS, 3)),
+                      year=1900 + idx % 120,
+                      description=' '.join(rng.sample(WORDS, 8)))
+                for idx in range(TITLES)
+            ),
+            batch_size=1000
+        )
+        for query in QUERIES:
+            measure(f'search {query!r}', search(query), REPEAT)
+        for query, count in found.items():
+            print(f'{query!r}: {count} of {TITLES} titles')
+
+
+if __name__ == '__main__':
+    main()
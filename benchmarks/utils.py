@@ -0,0 +1,47 @@
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+import django  # noqa: E402
+
+django.setup()
+# Ответы 4xx не должны засорять вывод замеров.
+logging.disable(logging.WARNING)
+
+
+@contextmanager
+def test_database():
+    from django.db import connection
+    from django.test.utils import (setup_test_environment,
+                                   teardown_test_environment)
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(name, func, repeat):
+    """Выполняет func(i) repeat раз и печатает число вызовов в секунду."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        for i in range(repeat):
+            func(i)
+        elapsed = time.perf_counter() - started
+    print(
+        f'{name}: {repeat / elapsed:.0f}/sec, '
+        f'{len(queries) / repeat:.1f} queries per call'
+    )
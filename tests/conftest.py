@@ -32,4 +32,6 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 
 pytest_plugins = [
     'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_query_budget',
+    'tests.fixtures.fixture_cache',
 ]
@@ -353,3 +353,58 @@ class Test04TitleAPI:
             f'Проверьте, что PUT-запрос к `{self.TITLES_DETAIL_URL_TEMPLATE} '
             'не предусмотрен и возвращает статус 405.'
         )
+
+    def test_07_titles_year_range_and_exact_slug_filters(self, client,
+                                                          admin_client):
+        titles, categories, genres = create_titles(admin_client)
+
+        response = client.get(
+            self.TITLES_URL, {'year_min': 1985, 'year_max': 1990}
+        )
+        names = [title['name'] for title in response.json()['results']]
+        assert names == [titles[1]['name']], (
+            f'Проверьте, что для эндпоинта `{self.TITLES_URL}` реализована '
+            'фильтрация по диапазону лет `year_min` и `year_max`.'
+        )
+
+        response = client.get(
+            self.TITLES_URL, {'genre': genres[0]['slug'][:3]}
+        )
+        assert response.json()['results'] == [], (
+            f'Проверьте, что для эндпоинта `{self.TITLES_URL}` фильтр '
+            '`genre` сравнивает `slug` жанра целиком.'
+        )
+        response = client.get(
+            self.TITLES_URL, {'category': categories[0]['slug'][:3]}
+        )
+        assert response.json()['results'] == [], (
+            f'Проверьте, что для эндпоинта `{self.TITLES_URL}` фильтр '
+            '`category` сравнивает `slug` категории целиком.'
+        )
+
+    def test_08_category_slug_rename_keeps_titles(self, client,
+                                                  admin_client):
+        from reviews.models import Category
+
+        titles, categories, _ = create_titles(admin_client)
+        category = Category.objects.get(slug=categories[0]['slug'])
+        category.slug = 'renamed'
+        category.save()
+
+        response = client.get(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        )
+        assert response.json()['category'] == {
+            'name': category.name, 'slug': 'renamed'
+        }, (
+            'Проверьте, что переименование слага категории не отвязывает '
+            'от неё произведения.'
+        )
+        response = client.get(self.TITLES_URL, {'category': 'renamed'})
+        assert response.json()['count'] == 1
+        response = admin_client.patch(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[1]['id']),
+            data={'category': 'renamed'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['category'] == 'renamed'
@@ -366,3 +366,33 @@ class Test06CommentAPI:
             f'Проверьте, что PUT-запрос к `{self.COMMENT_DETAIL_URL_TEMPLATE} '
             'не предусмотрен и возвращает статус 405.'
         )
+
+    def test_08_comment_wrong_title(self, admin_client, admin, user_client,
+                                    user):
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        wrong_title_id = titles[1]['id']
+        response = admin_client.get(
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=wrong_title_id, review_id=reviews[0]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии к отзыву недоступны по адресу с '
+            'чужим произведением.'
+        )
+        response = user_client.post(
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=wrong_title_id, review_id=reviews[0]['id']
+            ),
+            data={'text': 'Комментарий'}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = admin_client.get(
+            self.COMMENT_DETAIL_URL_TEMPLATE.format(
+                title_id=wrong_title_id,
+                review_id=reviews[0]['id'],
+                comment_id=comments[0]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
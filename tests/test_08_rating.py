@@ -0,0 +1,124 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json().get('rating')
+
+    def test_01_rating_follows_review_changes(self, client, admin_client,
+                                              admin, user_client, user,
+                                              moderator_client, moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        assert self.get_rating(client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'создании отзыва.'
+        )
+
+        user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 8}
+        )
+        assert self.get_rating(client, title_id) == 6, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки в отзыве.'
+        )
+
+        for review in reviews:
+            admin_client.delete(
+                self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                    title_id=title_id, review_id=review['id']
+                )
+            )
+        assert self.get_rating(client, title_id) is None, (
+            'Проверьте, что после удаления всех отзывов рейтинг произведения '
+            'равен `None`.'
+        )
+
+    def test_02_recompute_ratings(self, client, admin_client, admin,
+                                  user_client, user):
+        from reviews.models import Title
+
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        Title.objects.filter(pk=title_id).update(
+            score_sum=0, score_count=0, rating=None
+        )
+
+        call_command('recompute_ratings')
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.score_count, title.rating) == (
+            10, 2, 5
+        ), (
+            'Проверьте, что команда `recompute_ratings` восстанавливает '
+            'счётчики рейтинга по таблице отзывов.'
+        )
+
+    def test_03_title_delete_skips_per_review_counters(self, admin_client,
+                                                       admin,
+                                                       django_user_model):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Comment, Review, Tombstone
+
+        titles, _, _ = create_titles(admin_client)
+
+        def add_reviews(title_id, count):
+            for idx in range(count):
+                author = django_user_model.objects.create_user(
+                    username=f'author_{title_id}_{idx}',
+                    email=f'author_{title_id}_{idx}@yamdb.fake'
+                )
+                review = Review.objects.create(
+                    title_id=title_id, author=author, score=5, text='Отзыв'
+                )
+                Comment.objects.create(
+                    review=review, author=admin, text='Комментарий'
+                )
+
+        def delete_title(title_id):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.delete(
+                    self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+                )
+            assert response.status_code == HTTPStatus.NO_CONTENT
+            return len(context)
+
+        add_reviews(titles[0]['id'], 2)
+        add_reviews(titles[1]['id'], 10)
+        Tombstone.objects.all().delete()
+        assert delete_title(titles[0]['id']) == delete_title(
+            titles[1]['id']
+        ), (
+            'Проверьте, что удаление произведения не пересчитывает счётчики '
+            'для каждого из его отзывов и комментариев.'
+        )
+        assert Tombstone.objects.count() == 2 + 2 * (2 + 10), (
+            'Проверьте, что удаление произведения оставляет отметки об '
+            'удалении для его отзывов и комментариев.'
+        )
@@ -0,0 +1,243 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def test_01_title_list_queries(self, client, admin_client,
+                                   django_assert_num_queries):
+        create_titles(admin_client)
+        extra_titles = [
+            {
+                'name': f'Произведение {idx}',
+                'year': 2000 + idx,
+                'genre': ['drama'],
+                'category': 'films',
+                'description': 'Описание'
+            }
+            for idx in range(3)
+        ]
+        for data in extra_titles:
+            admin_client.post(self.TITLES_URL, data=data)
+
+        # ETag и Last-Modified, COUNT для пагинации, страница произведений
+        # с категориями и один запрос на жанры всей страницы.
+        with django_assert_num_queries(4):
+            response = client.get(self.TITLES_URL)
+        assert len(response.json()['results']) == 5, (
+            'Проверьте, что количество запросов к БД при GET-запросе к '
+            f'`{self.TITLES_URL}` не зависит от размера страницы.'
+        )
+
+    def test_02_title_detail_queries(self, client, admin_client,
+                                     django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        with django_assert_num_queries(2):
+            client.get(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(
+                    title_id=titles[0]['id']
+                )
+            )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryBudgets:
+
+    READ_URL_TEMPLATES = (
+        '/api/v1/titles/',
+        '/api/v1/titles/{title_id}/',
+        '/api/v1/genres/',
+        '/api/v1/categories/',
+        '/api/v1/titles/{title_id}/reviews/',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/',
+        '/api/v1/users/',
+    )
+
+    def test_01_read_endpoints_within_budget(self, admin_client, admin,
+                                             user_client, user,
+                                             moderator_client, moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        for url_template in self.READ_URL_TEMPLATES:
+            url = url_template.format(
+                title_id=titles[0]['id'],
+                review_id=reviews[0]['id'],
+                comment_id=comments[0]['id']
+            )
+            response = admin_client.get(url)
+            assert response.status_code == HTTPStatus.OK, url
+
+    def test_02_budget_exceeded_reports_sql(self, client, admin_client,
+                                            settings):
+        from api.query_budget import QueryBudgetExceeded
+
+        create_titles(admin_client)
+        settings.QUERY_BUDGETS = {'titles-list': 1}
+        with pytest.raises(QueryBudgetExceeded, match='SELECT'):
+            client.get('/api/v1/titles/')
+
+        settings.QUERY_BUDGET_MODE = 'warn'
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+
+        settings.QUERY_BUDGET_MODE = None
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что без QUERY_BUDGET_MODE бюджеты не проверяются.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09SignupQueries:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_signup_queries(self, client, django_assert_num_queries):
+        data = {'username': 'new_user', 'email': 'new_user@yamdb.fake'}
+        # Поиск по username/email, BEGIN и создание пользователя, письмо.
+        with django_assert_num_queries(4):
+            response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == HTTPStatus.OK
+
+        with django_assert_num_queries(2):
+            response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == HTTPStatus.OK
+
+        with django_assert_num_queries(1):
+            response = client.post(self.URL_SIGNUP, data={
+                'username': data['username'], 'email': 'other@yamdb.fake'
+            })
+        assert set(response.json()) == {'username'}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09ReviewWriteQueries:
+
+    def get_parent_selects(self, context, table):
+        return [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and f'FROM "{table}"' in query['sql']
+        ]
+
+    def test_01_review_and_comment_parents_loaded_once(self, admin_client,
+                                                       user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'a', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(self.get_parent_selects(context, 'reviews_title')) == 1, (
+            'Проверьте, что произведение загружается один раз за запрос.'
+        )
+        assert not self.get_parent_selects(context, 'reviews_review'), (
+            'Проверьте, что повторный отзыв отсекается ограничением БД, '
+            'а не предварительным запросом.'
+        )
+
+        response = user_client.post(url, data={'text': 'b', 'score': 3})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {
+            'non_field_errors': ['Можно оставлять только один отзыв!']
+        }
+
+        review_id = user_client.get(url).json()['results'][0]['id']
+        comments_url = f'{url}{review_id}/comments/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(comments_url, data={'text': 'c'})
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(self.get_parent_selects(context, 'reviews_review')) == 1
+
+    def test_02_other_integrity_errors_propagate(self, admin_client,
+                                                 user_client, monkeypatch):
+        from django.db import IntegrityError
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+
+        def fail(*args, **kwargs):
+            raise IntegrityError('FOREIGN KEY constraint failed')
+
+        monkeypatch.setattr(Review.objects, 'create', fail)
+        with pytest.raises(IntegrityError):
+            user_client.post(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+                data={'text': 'a', 'score': 5}
+            )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleWriteQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def count_queries(self, context, prefix, table):
+        return len([
+            query for query in context.captured_queries
+            if query['sql'].startswith(prefix) and f'"{table}"' in query['sql']
+        ])
+
+    def test_01_genres_resolved_and_written_in_bulk(self, admin_client):
+        for idx in range(4):
+            admin_client.post(
+                '/api/v1/genres/',
+                data={'name': f'Жанр {idx}', 'slug': f'genre-{idx}'}
+            )
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'}
+        )
+        data = {
+            'name': 'Произведение',
+            'year': 2000,
+            'category': 'films',
+            'genre': ['genre-0', 'genre-1', 'genre-2'],
+            'description': 'Описание',
+        }
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.TITLES_URL, data=data)
+        assert response.status_code == HTTPStatus.CREATED
+        assert len([
+            query for query in context.captured_queries
+            if 'WHERE "reviews_genre"."slug"' in query['sql']
+        ]) == 1, 'Проверьте, что слаги жанров проверяются одним запросом.'
+        assert self.count_queries(
+            context, 'INSERT', 'reviews_titlegenre'
+        ) == 1
+
+        url = f'{self.TITLES_URL}{response.json()["id"]}/'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.patch(
+                url, data={'genre': ['genre-1', 'genre-3']}
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert sorted(response.json()['genre']) == ['genre-1', 'genre-3']
+        assert self.count_queries(
+            context, 'DELETE', 'reviews_titlegenre'
+        ) == 1
+        assert self.count_queries(
+            context, 'INSERT', 'reviews_titlegenre'
+        ) == 1
+
+        response = admin_client.patch(
+            url, data={'genre': ['genre-1', 'unknown']}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'unknown' in response.json()['genre'][0], (
+            'Проверьте, что ошибка указывает на несуществующий слаг.'
+        )
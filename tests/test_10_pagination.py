@@ -0,0 +1,57 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_reviews_cursor_pages(self, client, admin_client,
+                                     django_user_model):
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        for idx in range(7):
+            author = django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                author=author, title_id=title_id, text=f'{idx}', score=5
+            )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        expected = [
+            review['id'] for review in
+            Review.objects.filter(title_id=title_id)
+            .order_by('-pub_date', '-id').values('id')
+        ]
+
+        response = client.get(url, {'cursor': ''})
+        assert response.status_code == HTTPStatus.OK
+        first_page = response.json()
+        assert 'count' not in first_page, (
+            f'Проверьте, что в режиме курсора `{self.REVIEWS_URL_TEMPLATE}` '
+            'не выполняет подсчёт всех отзывов.'
+        )
+        assert first_page['previous'] is None
+        second_page = client.get(first_page['next']).json()
+        assert second_page['next'] is None
+        ids = [
+            review['id']
+            for page in (first_page, second_page)
+            for review in page['results']
+        ]
+        assert ids == expected, (
+            'Проверьте, что страницы курсора содержат отзывы от новых к '
+            'старым без пропусков и повторов.'
+        )
+
+        previous_page = client.get(second_page['previous']).json()
+        assert previous_page['results'] == first_page['results']
+
+        response = client.get(url, {'cursor': 'broken'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
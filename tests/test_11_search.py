@@ -0,0 +1,111 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, query):
+        response = client.get(self.TITLES_URL, {'search': query})
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_prefix_typo_and_description(self, client,
+                                                   admin_client):
+        titles, _, _ = create_titles(admin_client)
+        terminator, die_hard = titles[0]['name'], titles[1]['name']
+
+        assert self.search(client, 'термин') == [terminator], (
+            f'Проверьте, что поиск `{self.TITLES_URL}?search=` находит '
+            'произведения по началу названия.'
+        )
+        assert self.search(client, 'ТЕРМИНАТР')[0] == terminator, (
+            f'Проверьте, что поиск `{self.TITLES_URL}?search=` допускает '
+            'опечатки и не зависит от регистра.'
+        )
+        assert self.search(client, 'yippie') == [die_hard], (
+            f'Проверьте, что поиск `{self.TITLES_URL}?search=` учитывает '
+            'описание произведения.'
+        )
+        assert self.search(client, 'крепкий орешек') == [die_hard]
+
+    def test_02_search_index_follows_changes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/', data={'name': 'Чужой'}
+        )
+        assert self.search(client, 'чужой') == ['Чужой'], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'произведения.'
+        )
+        admin_client.delete(f'{self.TITLES_URL}{titles[0]["id"]}/')
+        assert self.search(client, 'чужой') == [], (
+            'Проверьте, что поисковый индекс обновляется при удалении '
+            'произведения.'
+        )
+
+    def test_03_migrate_restores_lost_triggers(self, client, admin_client):
+        from django.core.management import call_command
+        from django.db import connection
+
+        from reviews.search import SQLITE_DROP_TRIGGERS_SQL
+
+        if connection.vendor != 'sqlite':
+            pytest.skip('Триггеры поиска есть только в SQLite.')
+        titles, _, _ = create_titles(admin_client)
+        # Так триггеры теряются, когда миграция пересоздаёт reviews_title.
+        with connection.cursor() as cursor:
+            for sql in SQLITE_DROP_TRIGGERS_SQL:
+                cursor.execute(sql)
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/', data={'name': 'Чужой'}
+        )
+        call_command('migrate', verbosity=0)
+        assert self.search(client, 'чужой') == ['Чужой'], (
+            'Проверьте, что после миграций потерянные триггеры поиска '
+            'создаются заново, а индекс перестраивается.'
+        )
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/', data={'name': 'Чужие'}
+        )
+        assert self.search(client, 'чужие') == ['Чужие']
+
+    def test_04_fuzzy_search_within_filters(self, client):
+        from reviews.models import Category, Title
+
+        films = Category.objects.create(name='Фильм', slug='films')
+        books = Category.objects.create(name='Книга', slug='books')
+        Title.objects.create(name='Терминатор', year=1984, category=films)
+        Title.objects.create(name='Терминал', year=2004, category=books)
+
+        response = client.get(
+            self.TITLES_URL, {'search': 'терминатор', 'category': 'books'}
+        )
+        assert [
+            title['name'] for title in response.json()['results']
+        ] == ['Терминал'], (
+            'Проверьте, что точные совпадения ищутся среди отобранных '
+            'фильтрами произведений, а без них поиск прощает опечатки.'
+        )
+        assert self.search(client, 'zzzqx') == [], (
+            'Проверьте, что нечёткий поиск требует заметной доли общих '
+            'триграмм.'
+        )
+        assert self.search(client, 'zzzqx терминатор')[0] == 'Терминатор'
+
+    def test_05_list_validators_skip_rank(self, client, admin_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            client.get(self.TITLES_URL, {'search': 'терминатор'})
+        assert len([
+            query for query in context.captured_queries
+            if 'bm25' in query['sql']
+        ]) == 1, (
+            'Проверьте, что ранг поиска считается только для страницы, '
+            'а не для условных заголовков списка.'
+        )
@@ -0,0 +1,192 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import (
+    create_comments, create_single_comment, create_single_review,
+    create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_anonymous_reads_are_cached(self, client, admin_client,
+                                           django_assert_num_queries):
+        create_titles(admin_client)
+        first = client.get(self.TITLES_URL)
+        with django_assert_num_queries(0):
+            second = client.get(self.TITLES_URL)
+        assert second.content == first.content, (
+            f'Проверьте, что повторный анонимный GET-запрос к '
+            f'`{self.TITLES_URL}` возвращает ответ из кеша.'
+        )
+
+    def test_02_writes_invalidate_affected_keys(self, client, admin_client,
+                                                admin, user_client, user,
+                                                django_assert_num_queries):
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        title_id = titles[0]['id']
+        comments_urls = [
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review['id']
+            )
+            for review in reviews
+        ]
+        for url in (self.TITLES_URL, *comments_urls):
+            client.get(url)
+
+        create_single_comment(user_client, title_id, reviews[0]['id'], 'new')
+        response = client.get(comments_urls[0])
+        assert response.json()['count'] == len(comments) + 1, (
+            'Проверьте, что новый комментарий сбрасывает кеш списка '
+            'комментариев к отзыву.'
+        )
+        with django_assert_num_queries(0):
+            client.get(comments_urls[1])
+            client.get(self.TITLES_URL)
+
+        user_client.patch(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+            + f'{reviews[1]["id"]}/',
+            data={'score': 10}
+        )
+        response = client.get(self.TITLES_URL)
+        ratings = {
+            title['id']: title['rating']
+            for title in response.json()['results']
+        }
+        assert ratings[title_id] == 7, (
+            'Проверьте, что изменение оценки сбрасывает кеш списка '
+            'произведений.'
+        )
+
+    def test_03_conditional_get(self, client, user_client, admin_client,
+                                django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response = user_client.get(url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        # Произведение и состояние списка, без выборки страницы.
+        with django_assert_num_queries(2):
+            response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{self.REVIEWS_URL_TEMPLATE}` '
+                'с актуальным If-None-Match возвращает статус 304.'
+            )
+        with django_assert_num_queries(2):
+            response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        create_single_review(user_client, titles[0]['id'], 'text', 5)
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после нового отзыва If-None-Match со старым '
+            'ETag возвращает актуальный список.'
+        )
+        assert response['ETag'] != etag
+
+    def test_04_validators_follow_database(self, client, user_client, user,
+                                           admin_client):
+        from api.cache import get_api_cache
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=1000),
+            HTTP_IF_NONE_MATCH='*'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что условия запроса проверяются после поиска '
+            'объекта, а не вместо него.'
+        )
+
+        etag = user_client.get(url)['ETag']
+        get_api_cache().clear()
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что ETag не зависит от состояния кеша процесса.'
+        )
+        # bulk_create не отправляет сигналов, как запись из другого
+        # процесса не сбрасывает локальный кеш этого.
+        Review.objects.bulk_create([Review(
+            title_id=titles[0]['id'], author=user, score=5, text='Отзыв'
+        )])
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ETag списка считается по данным в БД.'
+        )
+
+        etag = client.get(url)['ETag']
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что кешированный анонимный ответ тоже отвечает 304.'
+        )
+
+    def test_05_rating_bumps_only_affected_keys(self, client, admin_client,
+                                                admin, user_client,
+                                                django_assert_num_queries):
+        from django.db import transaction
+
+        from api.cache import get_namespace_versions
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        title_url = f'{self.TITLES_URL}{title_id}/'
+        create_single_review(user_client, title_id, 'Отзыв', 8)
+        client.get(self.TITLES_URL)
+        client.get(title_url, data={'expand': 'stats'})
+
+        create_single_review(admin_client, title_id, 'Отзыв', 9)
+        with django_assert_num_queries(0):
+            client.get(self.TITLES_URL)
+        response = client.get(title_url, data={'expand': 'stats'})
+        assert response.json()['stats']['review_count'] == 2, (
+            'Проверьте, что новый отзыв сбрасывает кеш карточки '
+            'произведения, а список - только если изменился рейтинг.'
+        )
+
+        versions = get_namespace_versions(('titles', f'title:{title_id}'))
+        with transaction.atomic():
+            Review.objects.filter(title_id=title_id).first().delete()
+            assert get_namespace_versions(
+                ('titles', f'title:{title_id}')
+            ) == versions, (
+                'Проверьте, что кеш сбрасывается только после фиксации '
+                'транзакции.'
+            )
+        assert get_namespace_versions(
+            ('titles', f'title:{title_id}')
+        ) != versions
+
+    def test_06_author_rename_refreshes_reviews(self, client, user_client,
+                                                user, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 8)
+        client.get(url)
+        etag = user_client.get(url)['ETag']
+
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'username': 'Renamed'}
+        )
+        response = client.get(url)
+        assert response.json()['results'][0]['author'] == 'Renamed', (
+            'Проверьте, что переименование автора сбрасывает кеш списка '
+            'отзывов.'
+        )
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ETag списка отзывов учитывает изменение '
+            'автора.'
+        )
@@ -0,0 +1,90 @@
+import csv
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ImportCSV:
+
+    def test_01_import_all_datasets(self):
+        from reviews.models import Comment, Review, Title, TitleGenre
+
+        call_command('import_csv')
+        assert Title.objects.count() == 32
+        assert TitleGenre.objects.count() == 42
+        assert Comment.objects.filter(author__username='capt_obvious').exists()
+        review = Review.objects.order_by('id').first()
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что команда `import_csv` сохраняет `pub_date` из '
+            'файла.'
+        )
+        assert Title.objects.get(pk=1).rating == 10, (
+            'Проверьте, что после загрузки отзывов пересчитывается рейтинг.'
+        )
+
+        call_command('import_csv', 'genre_title', truncate=True)
+        assert TitleGenre.objects.count() == 42
+
+    def test_02_export_data(self, tmp_path):
+        call_command('import_csv')
+        call_command('export_data', output=tmp_path, format='jsonl')
+        call_command('export_data', 'reviews', output=tmp_path)
+
+        with open(tmp_path / 'titles.jsonl', encoding='utf-8') as file:
+            titles = [json.loads(line) for line in file]
+        assert len(titles) == 32
+        assert titles[4]['genre'] == ['comedy', 'detective', 'thriller'], (
+            'Проверьте, что команда `export_data` выгружает жанры '
+            'произведений.'
+        )
+        with open(tmp_path / 'reviews.csv', encoding='utf-8') as file:
+            reviews = list(csv.DictReader(file))
+        assert reviews[0]['author'] == 'bingobongo'
+
+    def test_03_truncate_without_cascade(self):
+        from reviews.models import Comment, Review, Tombstone
+
+        call_command('import_csv')
+        reviews, comments = Review.objects.count(), Comment.objects.count()
+        with pytest.raises(CommandError):
+            call_command('import_csv', 'titles', truncate=True)
+        assert Review.objects.count() == reviews, (
+            'Проверьте, что `import_csv --truncate` не очищает таблицы, '
+            'которые не загружаются.'
+        )
+
+        call_command('import_csv', 'review', 'comments', truncate=True)
+        assert Comment.objects.count() == comments
+        assert Tombstone.objects.filter(model='comment').count() == comments, (
+            'Проверьте, что `import_csv --truncate` пишет отметки об '
+            'удалении для ленты изменений.'
+        )
+
+    def test_04_parallel_export_round_trip(self, tmp_path):
+        from users.models import User
+
+        call_command('import_csv', 'users')
+        users = list(User.objects.order_by('id').values_list(
+            'id', 'username', 'email', 'role'
+        ))
+        call_command(
+            'export_data', 'users', 'comments', output=tmp_path, workers=2
+        )
+        with open(tmp_path / 'comments.csv', encoding='utf-8') as file:
+            assert file.readline().strip() == (
+                'id,review_id,text,pub_date,author'
+            ), (
+                'Проверьте, что команда `export_data` пишет заголовок CSV '
+                'и для пустой таблицы.'
+            )
+
+        User.objects.all().delete()
+        call_command('import_csv', 'users', 'comments', path=tmp_path)
+        assert list(User.objects.order_by('id').values_list(
+            'id', 'username', 'email', 'role'
+        )) == users, (
+            'Проверьте, что выгрузка `export_data --workers` загружается '
+            'обратно командой `import_csv`.'
+        )
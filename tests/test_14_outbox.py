@@ -0,0 +1,112 @@
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14EmailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_signup_enqueues_email(self, client):
+        from users.models import OutgoingEmail
+
+        for idx in range(3):
+            client.post(self.URL_SIGNUP, data={
+                'email': f'user{idx}@yamdb.fake', 'username': f'user{idx}'
+            })
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что письмо с кодом подтверждения не отправляется '
+            'во время обработки запроса.'
+        )
+        assert OutgoingEmail.objects.filter(sent_at=None).count() == 3
+
+        call_command('send_emails', once=True, batch_size=2)
+        call_command('send_emails', once=True, batch_size=2)
+        assert len(mail.outbox) == 3
+        assert not OutgoingEmail.objects.filter(sent_at=None).exists()
+
+    def test_02_failed_emails_are_retried_with_backoff(self, settings):
+        from users.models import OutgoingEmail
+        from users.outbox import dispatch_outbox, enqueue_email
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+        settings.EMAIL_HOST = '127.0.0.1'
+        settings.EMAIL_PORT = 1
+        email = enqueue_email('subject', 'message', 'a@yamdb.fake',
+                              'b@yamdb.fake')
+
+        assert dispatch_outbox(10, 3, 60) == (0, 1)
+        email.refresh_from_db()
+        assert email.attempts == 1 and email.sent_at is None
+        assert email.next_attempt_at > email.created
+        assert dispatch_outbox(10, 3, 60) == (0, 0), (
+            'Проверьте, что письмо не отправляется повторно до истечения '
+            'задержки.'
+        )
+
+        OutgoingEmail.objects.update(next_attempt_at=email.created)
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        assert dispatch_outbox(10, 3, 60) == (1, 0)
+        assert mail.outbox[0].to == ['b@yamdb.fake']
+
+    def test_03_concurrent_signup_sends_code(self, client, monkeypatch):
+        from api.serializers import UserCreateSerializer
+        from users.models import OutgoingEmail, User
+
+        data = {'email': 'user@yamdb.fake', 'username': 'user'}
+        get_conflicts = UserCreateSerializer.get_conflicts
+        calls = []
+
+        def race(serializer, username, email):
+            # Пока идёт проверка, параллельный запрос создаёт пользователя.
+            if not calls:
+                calls.append(username)
+                User.objects.create(username=username, email=email)
+                return None, {}
+            return get_conflicts(serializer, username, email)
+
+        monkeypatch.setattr(UserCreateSerializer, 'get_conflicts', race)
+        response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == 200, (
+            'Проверьте, что регистрация, совпавшая с параллельной, '
+            'высылает код подтверждения, как повторная регистрация.'
+        )
+        assert OutgoingEmail.objects.filter(
+            recipient=data['email']
+        ).count() == 1
+
+    def test_04_emails_sent_outside_transaction(self, monkeypatch):
+        from django.db import connection
+
+        from users import outbox
+
+        get_connection = outbox.get_connection
+        in_transaction = []
+
+        def record(*args, **kwargs):
+            in_transaction.append(connection.in_atomic_block)
+            return get_connection(*args, **kwargs)
+
+        monkeypatch.setattr(outbox, 'get_connection', record)
+        outbox.enqueue_email('subject', 'message', 'a@yamdb.fake',
+                             'b@yamdb.fake')
+        assert outbox.dispatch_outbox(10, 3, 60) == (1, 0)
+        assert in_transaction == [False], (
+            'Проверьте, что письма отправляются после фиксации транзакции, '
+            'а не под блокировкой строк очереди.'
+        )
+
+    def test_05_dispatch_inside_outer_transaction(self):
+        from django.db import transaction
+
+        from users import outbox
+
+        outbox.enqueue_email('subject', 'message', 'a@yamdb.fake',
+                             'b@yamdb.fake')
+        with transaction.atomic():
+            assert outbox.dispatch_outbox(10, 3, 60) == (1, 0), (
+                'Проверьте, что внутри внешней транзакции письма '
+                'отправляются, а не откладываются до её фиксации.'
+            )
+        assert len(mail.outbox) == 1
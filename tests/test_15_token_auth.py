@@ -0,0 +1,100 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews, get_token_client
+from users.tokens import get_token_version
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TokenAuth:
+
+    def test_01_authenticated_read_skips_user_query(self, client, user):
+        user_client = get_token_client(client, user)
+        # Первый запрос читает версию токена из БД и кладёт её в кеш.
+        user_client.get('/api/v1/titles/')
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        assert not [
+            query for query in context.captured_queries
+            if 'users_user' in query['sql']
+        ], (
+            'Проверьте, что аутентификация по токену с ролью не загружает '
+            'пользователя из БД.'
+        )
+
+    def test_02_role_change_revokes_token(self, client, admin_client,
+                                          moderator):
+        moderator_client = get_token_client(client, moderator)
+        response = moderator_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['role'] == 'moderator'
+
+        admin_client.patch(
+            f'/api/v1/users/{moderator.username}/', data={'role': 'user'}
+        )
+        response = moderator_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что после смены роли ранее выданный токен '
+            'перестаёт приниматься.'
+        )
+        response = get_token_client(client, moderator).get(
+            '/api/v1/users/me/'
+        )
+        assert response.json()['role'] == 'user'
+
+    def test_03_deleted_user_token_rejected(self, client, admin_client,
+                                            user):
+        user_client = get_token_client(client, user)
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен удалённого пользователя не принимается.'
+        )
+
+    def test_04_token_user_creates_and_edits_review(self, client,
+                                                    admin_client, user,
+                                                    moderator):
+        user_client = get_token_client(client, user)
+        reviews, titles = create_reviews(
+            admin_client, {user: user_client}
+        )
+        review_url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        )
+        response = user_client.patch(review_url, data={'text': 'Новый'})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что автор с токеном по ролям может изменить свой '
+            'отзыв.'
+        )
+        response = user_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'Второй отзыв', 'score': 3}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = get_token_client(client, moderator).delete(review_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+    def test_05_stale_save_keeps_token_version(self, user,
+                                               django_user_model):
+        stale = django_user_model.objects.get(pk=user.pk)
+        user.role = 'moderator'
+        user.save()
+        assert user.token_version == 1
+
+        stale.bio = 'Биография'
+        stale.save()
+        user.refresh_from_db()
+        assert user.token_version == get_token_version(user.pk) == 1, (
+            'Проверьте, что обычное сохранение пользователя не перезаписывает '
+            '`token_version` значением из памяти ни в БД, ни в кеше.'
+        )
+        stale.is_staff = True
+        stale.save()
+        assert stale.token_version == 2, (
+            'Проверьте, что версия токенов увеличивается атомарно, без '
+            'потери параллельных изменений.'
+        )
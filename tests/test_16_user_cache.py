@@ -0,0 +1,63 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import get_token_client
+from users.cache import user_cache
+
+
+def get_user_queries(context):
+    return [
+        query for query in context.captured_queries
+        if 'users_user' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16UserCache:
+
+    ME_URL = '/api/v1/users/me/'
+
+    def test_01_repeated_requests_hit_cache(self, client, user):
+        user_client = get_token_client(client, user)
+        user_client.get(self.ME_URL)
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(self.ME_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['username'] == 'TestUser'
+        assert not get_user_queries(context), (
+            'Проверьте, что повторный запрос пользователя берёт его из кеша, '
+            'а не из БД.'
+        )
+        stats = user_cache.stats()
+        assert stats['hits'] >= 1 and stats['misses'] == 1
+
+    def test_02_changes_invalidate_cache(self, client, admin_client, user):
+        user_client = get_token_client(client, user)
+        user_client.get(self.ME_URL)
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'bio': 'Новое о себе'}
+        )
+        response = user_client.get(self.ME_URL)
+        assert response.json()['bio'] == 'Новое о себе', (
+            'Проверьте, что изменение пользователя сбрасывает его кеш.'
+        )
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        response = user_client.get(self.ME_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_03_me_patch_keeps_password(self, client, user):
+        user_client = get_token_client(client, user)
+        user_client.get(self.ME_URL)
+        response = user_client.patch(
+            self.ME_URL, data={'bio': 'Новое о себе'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        user.refresh_from_db()
+        assert user.bio == 'Новое о себе'
+        assert user.check_password('1234567'), (
+            'Проверьте, что сохранение пользователя из кеша не затирает '
+            'пароль.'
+        )
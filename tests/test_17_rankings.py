@@ -0,0 +1,135 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Category, Genre, Review, Title, TitleRanking
+from users.models import User
+
+
+def create_title(name, year, category, genres):
+    title = Title.objects.create(
+        name=name, year=year, category=category, description=''
+    )
+    title.genre.set(genres)
+    return title
+
+
+def add_reviews(title, scores):
+    for score in scores:
+        author = User.objects.create(
+            username=f'reviewer{User.objects.count()}',
+            email=f'reviewer{User.objects.count()}@yamdb.fake'
+        )
+        Review.objects.create(
+            title=title, author=author, score=score, text='Отзыв'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17TitleRankings:
+
+    TOP_URL = '/api/v1/titles/top/'
+
+    @pytest.fixture
+    def catalogue(self):
+        films = Category.objects.create(name='Фильм', slug='films')
+        books = Category.objects.create(name='Книга', slug='books')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        single = create_title('Одна десятка', 2000, films, [drama])
+        popular = create_title('Много девяток', 2000, books, [drama])
+        weak = create_title('Слабое', 2001, films, [comedy])
+        create_title('Без отзывов', 2001, films, [comedy])
+        add_reviews(single, [10])
+        add_reviews(popular, [9] * 5)
+        add_reviews(weak, [2] * 3)
+        call_command('rebuild_rankings')
+        return single, popular, weak
+
+    def get_names(self, client, **params):
+        response = client.get(self.TOP_URL, data=params)
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()]
+
+    def test_01_bayesian_order(self, client, catalogue):
+        response = client.get(self.TOP_URL)
+        data = response.json()
+        assert [title['name'] for title in data] == [
+            'Много девяток', 'Одна десятка', 'Слабое'
+        ], (
+            'Проверьте, что рейтинг учитывает количество отзывов и не '
+            'содержит произведений без оценок.'
+        )
+        assert data[0]['score'] > data[1]['score'] > data[2]['score']
+        assert {'id', 'genre', 'category', 'rating'} <= set(data[0])
+
+    def test_02_scopes_and_limit(self, client, catalogue):
+        assert self.get_names(client, category='films') == [
+            'Одна десятка', 'Слабое'
+        ]
+        assert self.get_names(client, genre='drama') == [
+            'Много девяток', 'Одна десятка'
+        ]
+        assert self.get_names(client, year=2001) == ['Слабое']
+        assert self.get_names(client, limit=1) == ['Много девяток']
+        response = client.get(
+            self.TOP_URL, data={'category': 'films', 'genre': 'drama'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.get(self.TOP_URL, data={'limit': 1000})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_incremental_refresh(self, client, catalogue):
+        single, popular, weak = catalogue
+        add_reviews(weak, [10] * 20)
+        assert self.get_names(client)[0] == 'Слабое', (
+            'Проверьте, что рейтинг обновляется при изменении отзывов.'
+        )
+        comedy = Genre.objects.get(slug='comedy')
+        popular.genre.add(comedy)
+        assert self.get_names(client, genre='comedy') == [
+            'Слабое', 'Много девяток'
+        ]
+        popular.refresh_from_db()
+        popular.category = None
+        popular.save()
+        assert self.get_names(client, category='books') == []
+        genre = Genre.objects.get(slug='drama')
+        genre.slug = 'dramas'
+        genre.save()
+        assert 'Много девяток' in self.get_names(client, genre='dramas')
+        Review.objects.filter(title=single).delete()
+        assert 'Одна десятка' not in self.get_names(client)
+
+    def test_04_top_with_stats(self, client, catalogue,
+                               django_assert_max_num_queries):
+        with django_assert_max_num_queries(2):
+            response = client.get(self.TOP_URL, data={'expand': 'stats'})
+        data = response.json()
+        assert data[0]['stats']['review_count'] == 5, (
+            'Проверьте, что `?expand=stats` добавляет статистику в рейтинг '
+            'без отдельного запроса на каждое произведение.'
+        )
+
+    def test_05_rankings_share_stored_prior(self, client, catalogue):
+        from django.core.cache import cache
+
+        single, popular, weak = catalogue
+        stored = set(
+            TitleRanking.objects.values_list('prior_mean', flat=True)
+        )
+        assert len(stored) == 1
+        cache.clear()
+        add_reviews(weak, [10] * 20)
+        add_reviews(single, [1])
+        assert set(
+            TitleRanking.objects.values_list('prior_mean', flat=True)
+        ) == stored, (
+            'Проверьте, что все строки рейтинга посчитаны с одной средней '
+            'оценкой каталога, пока она не пересчитана rebuild_rankings.'
+        )
+        call_command('rebuild_rankings')
+        assert set(
+            TitleRanking.objects.values_list('prior_mean', flat=True)
+        ) != stored
@@ -0,0 +1,143 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import TitleStats
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18TitleStats:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_stats(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id),
+            data={'expand': 'stats'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['stats']
+
+    def test_01_stats_follow_reviews_and_comments(self, client,
+                                                  admin_client,
+                                                  user_client,
+                                                  moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert 'stats' not in response.json(), (
+            'Проверьте, что статистика отдаётся только с `?expand=stats`.'
+        )
+        stats = self.get_stats(client, title_id)
+        assert stats['review_count'] == 0
+        assert stats['last_review_at'] is None
+
+        first = create_single_review(user_client, title_id, 'Отзыв', 7)
+        second = create_single_review(moderator_client, title_id, 'Да', 3)
+        create_single_comment(
+            admin_client, title_id, first.json()['id'], 'Комментарий'
+        )
+        create_single_comment(
+            user_client, title_id, first.json()['id'], 'Ещё'
+        )
+        stats = self.get_stats(client, title_id)
+        assert stats['scores']['7'] == 1 and stats['scores']['3'] == 1, (
+            'Проверьте, что распределение оценок обновляется при создании '
+            'отзыва.'
+        )
+        assert stats['review_count'] == 2
+        assert stats['comment_count'] == 2
+        assert stats['last_review_at'] == second.json()['pub_date']
+
+        user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=first.json()['id']
+            ),
+            data={'score': 10}
+        )
+        stats = self.get_stats(client, title_id)
+        assert stats['scores']['7'] == 0 and stats['scores']['10'] == 1
+
+        moderator_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=second.json()['id']
+            )
+        )
+        user_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=first.json()['id']
+            )
+        )
+        stats = self.get_stats(client, title_id)
+        assert stats['review_count'] == 0
+        assert stats['comment_count'] == 0, (
+            'Проверьте, что удаление отзыва уменьшает счётчик комментариев.'
+        )
+        assert stats['last_review_at'] is None
+        assert sum(stats['scores'].values()) == 0
+
+    def test_02_recompute_restores_stats(self, client, admin_client,
+                                         user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Отзыв', 8)
+        TitleStats.objects.all().delete()
+        call_command('recompute_ratings')
+        stats = self.get_stats(client, title_id)
+        assert stats['scores']['8'] == 1
+        assert stats['review_count'] == 1
+
+    def test_03_comment_restores_missing_stats(self, client, admin_client,
+                                               user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(user_client, title_id, 'Отзыв', 8)
+        TitleStats.objects.filter(title_id=title_id).delete()
+        create_single_comment(
+            admin_client, title_id, review.json()['id'], 'Комментарий'
+        )
+        stats = self.get_stats(client, title_id)
+        assert stats['comment_count'] == 1 and stats['review_count'] == 1, (
+            'Проверьте, что без записи статистики новый комментарий '
+            'собирает её заново.'
+        )
+
+    def test_04_title_without_stats_row(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        TitleStats.objects.filter(title_id=title_id).delete()
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id),
+            data={'expand': 'stats'}
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что карточка произведения без записи статистики '
+            'отдаётся так же, как и список.'
+        )
+
+    def test_05_stats_cached_per_title(self, client, admin_client,
+                                       user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id, other_id = titles[0]['id'], titles[1]['id']
+        review = create_single_review(user_client, title_id, 'Отзыв', 8)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=other_id)
+        etag = client.get(url, data={'expand': 'stats'})['ETag']
+        create_single_comment(
+            admin_client, title_id, review.json()['id'], 'Комментарий'
+        )
+        response = client.get(
+            url, data={'expand': 'stats'}, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что комментарий к одному произведению не сбрасывает '
+            'кеш статистики других.'
+        )
+        assert self.get_stats(client, title_id)['comment_count'] == 1
@@ -0,0 +1,79 @@
+import datetime
+import io
+from decimal import Decimal
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+
+DATA = {
+    'text': 'Отличный фильм — «Сталкер»',
+    'pub_date': timezone.now(),
+    'naive': datetime.datetime(2023, 1, 2, 3, 4, 5, 678901),
+    'date': datetime.date(2023, 1, 2),
+    'score': Decimal('7.50'),
+    'rating': 7.25,
+    'scores': {1: 0, 10: 3},
+    'separator': 'строка\u2028абзац\u2029',
+    'lazy': gettext_lazy('Произведение'),
+    'results': [{'id': idx, 'name': f'Произведение {idx}'}
+                for idx in range(3)],
+}
+
+
+class Test19FastJSON:
+
+    def test_01_render_matches_drf(self):
+        assert FastJSONRenderer().render(DATA) == JSONRenderer().render(
+            DATA
+        ), (
+            'Проверьте, что быстрый рендерер выдаёт те же байты, что и '
+            'стандартный JSONRenderer.'
+        )
+        assert FastJSONRenderer().render(None) == b''
+        indented = FastJSONRenderer().render(
+            DATA, 'application/json; indent=4'
+        )
+        assert indented == JSONRenderer().render(
+            DATA, 'application/json; indent=4'
+        )
+
+    def test_02_render_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(renderers, 'orjson', None)
+        assert FastJSONRenderer().render(DATA) == JSONRenderer().render(
+            DATA
+        )
+
+    def test_03_parse_matches_drf(self):
+        body = JSONRenderer().render({
+            key: value for key, value in DATA.items()
+            if key in ('text', 'rating', 'results', 'separator')
+        })
+        assert FastJSONParser().parse(io.BytesIO(body)) == (
+            JSONParser().parse(io.BytesIO(body))
+        )
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"text": '))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_api_uses_fast_json(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/genres/',
+            data={'name': 'Драма', 'slug': 'drama'},
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert 'Драма'.encode() in response.content, (
+            'Проверьте, что кириллица в ответах не экранируется.'
+        )
+        assert isinstance(
+            response.accepted_renderer, FastJSONRenderer
+        )
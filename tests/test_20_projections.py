@@ -0,0 +1,67 @@
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from api.projections import (CommentProjection, ReviewProjection,
+                             TitleProjection)
+from api.serializers import (CommentSerializer, ReviewSerializer,
+                             TitleReadSerializer)
+from reviews.models import Comment, Review, Title
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20ValuesProjections:
+
+    def render_projection(self, projection, queryset):
+        return JSONRenderer().render(
+            projection.to_representation(list(projection.project(queryset)))
+        )
+
+    def test_01_projections_match_serializers(self, admin_client, admin,
+                                              user_client, user):
+        create_comments(admin_client, {admin: admin_client, user: user_client})
+        Title.objects.create(name='Без категории', year=2000, description='')
+        titles = Title.objects.select_related('category').prefetch_related(
+            'genre'
+        ).order_by('name')
+        cases = (
+            (TitleProjection(), TitleReadSerializer, titles),
+            (ReviewProjection(), ReviewSerializer,
+             Review.objects.select_related('author')),
+            (CommentProjection(), CommentSerializer,
+             Comment.objects.select_related('author')),
+        )
+        for projection, serializer_class, queryset in cases:
+            expected = JSONRenderer().render(
+                serializer_class(queryset, many=True).data
+            )
+            assert self.render_projection(projection, queryset) == expected, (
+                f'Проверьте, что {type(projection).__name__} выдаёт тот же '
+                f'JSON, что и {serializer_class.__name__}.'
+            )
+
+    def test_02_list_endpoints_match_serializers(self, client, admin_client,
+                                                 admin, user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        comments_url = f'{reviews_url}{review_id}/comments/'
+        cases = (
+            ('/api/v1/titles/', TitleReadSerializer, Title),
+            (reviews_url, ReviewSerializer, Review),
+            (f'{reviews_url}?cursor=', ReviewSerializer, Review),
+            (comments_url, CommentSerializer, Comment),
+            (f'{comments_url}?cursor=', CommentSerializer, Comment),
+        )
+        for url, serializer_class, model in cases:
+            results = client.get(url).json()['results']
+            objects = model.objects.in_bulk([item['id'] for item in results])
+            expected = serializer_class(
+                [objects[item['id']] for item in results], many=True
+            ).data
+            assert results == expected, (
+                f'Проверьте, что список `{url}` совпадает с выводом '
+                f'{serializer_class.__name__}.'
+            )
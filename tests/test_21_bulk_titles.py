@@ -0,0 +1,182 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Title, TitleRanking, TitleStats
+from tests.utils import create_categories, create_genre
+
+
+def make_title(external_id, **fields):
+    data = {
+        'external_id': external_id,
+        'name': f'Произведение {external_id}',
+        'year': 2000,
+        'description': 'Описание',
+        'genre': ['horror'],
+        'category': 'films',
+    }
+    data.update(fields)
+    return data
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21BulkTitles:
+
+    BULK_URL = '/api/v1/titles/bulk/'
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def catalogue(self, admin_client):
+        create_genre(admin_client)
+        create_categories(admin_client)
+
+    def post(self, client, titles):
+        return client.post(self.BULK_URL, data={'titles': titles},
+                           format='json')
+
+    def test_01_bulk_only_for_admin(self, client, user_client,
+                                    moderator_client, catalogue):
+        titles = [make_title('p-1')]
+        for request_client in (client, user_client, moderator_client):
+            response = self.post(request_client, titles)
+            assert response.status_code in (
+                HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN
+            ), (
+                f'Проверьте, что `{self.BULK_URL}` доступен только '
+                'администратору.'
+            )
+        assert not Title.objects.exists()
+
+    def test_02_bulk_creates_and_updates(self, client, admin_client,
+                                         catalogue):
+        response = self.post(admin_client, [
+            make_title('p-1', genre=['horror', 'comedy']),
+            make_title('p-2', category='books'),
+        ])
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            'created', 'created'
+        ]
+        first = Title.objects.get(external_id='p-1')
+        assert results[0]['id'] == first.pk
+        assert set(first.genre.values_list('slug', flat=True)) == {
+            'horror', 'comedy'
+        }
+        assert TitleStats.objects.count() == 2, (
+            'Проверьте, что для новых произведений создаётся статистика.'
+        )
+
+        response = self.post(admin_client, [
+            make_title('p-1', name='Новое', genre=['comedy', 'drama']),
+            make_title('p-3'),
+        ])
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            'updated', 'created'
+        ]
+        assert results[0]['id'] == first.pk, (
+            'Проверьте, что произведение с известным external_id '
+            'обновляется, а не создаётся заново.'
+        )
+        first.refresh_from_db()
+        assert first.name == 'Новое'
+        assert set(first.genre.values_list('slug', flat=True)) == {
+            'comedy', 'drama'
+        }
+        assert Title.objects.count() == 3
+
+        response = client.get(self.TITLES_URL, data={'genre': 'drama'})
+        assert [title['name'] for title in response.json()['results']] == [
+            'Новое'
+        ], 'Проверьте, что пакетная запись сбрасывает кеш списка.'
+        assert set(TitleRanking.objects.filter(
+            title=first, scope=TitleRanking.GENRE
+        ).values_list('key', flat=True)) == {'comedy', 'drama'}, (
+            'Проверьте, что пакетная запись пересобирает рейтинги.'
+        )
+
+    def test_03_bulk_reports_invalid_items(self, admin_client, catalogue):
+        response = self.post(admin_client, [
+            make_title('p-1'),
+            make_title('p-2', category='unknown'),
+            make_title('p-3', genre=['horror', 'unknown']),
+            make_title('p-1', name='Повтор'),
+            {'external_id': 'p-4', 'name': 'Без года'},
+            'не объект',
+        ])
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            'created', 'invalid', 'invalid', 'invalid', 'invalid', 'invalid'
+        ]
+        assert 'category' in results[1]['errors']
+        assert len(results[2]['errors']['genre']) == 1
+        assert 'external_id' in results[3]['errors']
+        assert 'year' in results[4]['errors']
+        assert list(Title.objects.values_list('external_id', flat=True)) == [
+            'p-1'
+        ], 'Проверьте, что ошибочные произведения не записываются.'
+
+    def test_04_bulk_limits(self, admin_client, catalogue, settings):
+        settings.TITLE_BULK_MAX_SIZE = 2
+        response = self.post(
+            admin_client, [make_title(f'p-{idx}') for idx in range(3)]
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что число произведений в запросе ограничено '
+            '`TITLE_BULK_MAX_SIZE`.'
+        )
+        response = self.post(admin_client, [])
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_05_bulk_queries_do_not_grow(self, admin_client, catalogue):
+        genre = ['comedy', 'drama']
+        self.post(admin_client, [make_title('p-0', genre=genre)])
+        counts = []
+        for size in (2, 20):
+            titles = [
+                make_title(f'p-{idx}', genre=genre) for idx in range(size)
+            ]
+            with CaptureQueriesContext(connection) as context:
+                response = self.post(admin_client, titles)
+            assert response.status_code == HTTPStatus.OK
+            counts.append(len(context.captured_queries))
+        assert counts[0] == counts[1], (
+            'Проверьте, что число запросов не зависит от числа '
+            'произведений в пакете.'
+        )
+
+    def test_06_bulk_integrity_errors(self, admin_client, catalogue,
+                                      monkeypatch):
+        from django.db import IntegrityError
+
+        from api.serializers import TitleBulkSerializer
+
+        def fail(serializer, items):
+            raise IntegrityError('FOREIGN KEY constraint failed')
+
+        monkeypatch.setattr(TitleBulkSerializer, 'create_titles', fail)
+        with pytest.raises(IntegrityError):
+            self.post(admin_client, [make_title('p-1')])
+
+        save_titles = TitleBulkSerializer.save_titles
+
+        def save_with_concurrent_insert(serializer, items):
+            # Параллельный запрос успел записать тот же external_id.
+            try:
+                save_titles(serializer, items)
+            finally:
+                Title.objects.create(name='Параллельно', year=2000,
+                                     external_id='p-1')
+
+        monkeypatch.setattr(
+            TitleBulkSerializer, 'save_titles', save_with_concurrent_insert
+        )
+        response = self.post(admin_client, [make_title('p-1')])
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что конфликт external_id с параллельным запросом '
+            'возвращает ответ со статусом 400.'
+        )
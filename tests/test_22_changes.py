@@ -0,0 +1,149 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from api.changes import encode_cursor
+from reviews.models import Genre, Title, Tombstone
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22ChangeFeed:
+
+    CHANGES_URL = '/api/v1/changes/'
+
+    @pytest.fixture(autouse=True)
+    def settle_time(self, settings):
+        settings.CHANGES_SETTLE_TIME = 0
+
+    def read_feed(self, client, cursor=None):
+        """Читает ленту до конца, возвращает изменения и новый курсор."""
+        changes = []
+        params = {} if cursor is None else {'since': cursor}
+        while True:
+            response = client.get(self.CHANGES_URL, data=params)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{self.CHANGES_URL}` '
+                'возвращает ответ со статусом 200.'
+            )
+            data = response.json()
+            changes.extend(data['results'])
+            params = {'since': data['cursor']}
+            if data['next'] is None:
+                return changes, data['cursor']
+
+    def test_01_feed_starts_with_catalogue(self, client, admin_client,
+                                           settings):
+        settings.CHANGES_PAGE_SIZE = 2
+        titles, categories, genres = create_titles(admin_client)
+        changes, cursor = self.read_feed(client)
+        assert [change['op'] for change in changes] == ['upsert'] * (
+            len(titles) + len(categories) + len(genres)
+        ), (
+            'Проверьте, что лента без курсора отдаёт каждый объект каталога '
+            'ровно один раз, в том числе при чтении по страницам.'
+        )
+        types = [change['type'] for change in changes]
+        assert types.index('title') > types.index('genre'), (
+            'Проверьте, что изменения отдаются в порядке записи.'
+        )
+        title = next(
+            change for change in changes if change['type'] == 'title'
+        )
+        assert title['data']['id'] == title['id']
+        assert {'name', 'year', 'genre', 'category'} <= set(title['data'])
+
+        changes, same_cursor = self.read_feed(client, cursor)
+        assert changes == [] and same_cursor == cursor, (
+            'Проверьте, что без новых изменений лента пуста, а курсор '
+            'не меняется.'
+        )
+
+    def test_02_feed_returns_changes_since_cursor(self, client, admin_client,
+                                                  user_client):
+        titles, _, genres = create_titles(admin_client)
+        _, cursor = self.read_feed(client)
+
+        title_id = titles[0]['id']
+        genre_id = Genre.objects.get(slug=genres[2]['slug']).pk
+        review = create_single_review(user_client, title_id, 'Отзыв', 8)
+        review_id = review.json()['id']
+        comment = create_single_comment(
+            user_client, title_id, review_id, 'Комментарий'
+        )
+        admin_client.delete(f'/api/v1/genres/{genres[2]["slug"]}/')
+        user_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+            f'{comment.json()["id"]}/'
+        )
+
+        changes, _ = self.read_feed(client, cursor)
+        changed = {
+            (change['type'], change['op'], change['id'])
+            for change in changes
+        }
+        assert ('review', 'upsert', review_id) in changed
+        assert ('comment', 'delete', comment.json()['id']) in changed, (
+            'Проверьте, что удаление попадает в ленту как отметка delete.'
+        )
+        assert ('genre', 'delete', genre_id) in changed
+        assert ('title', 'upsert', title_id) in changed, (
+            'Проверьте, что изменение рейтинга обновляет `updated_at` '
+            'произведения.'
+        )
+        assert ('title', 'upsert', titles[1]['id']) in changed, (
+            'Проверьте, что удаление жанра обновляет `updated_at` его '
+            'произведений.'
+        )
+        assert not any(
+            change['type'] == 'category' for change in changes
+        ), 'Проверьте, что в ленту попадают только изменённые объекты.'
+
+    def test_03_feed_cursor_checks(self, client, admin_client, settings):
+        create_titles(admin_client)
+        settings.CHANGES_SETTLE_TIME = 60
+        response = client.get(self.CHANGES_URL)
+        assert response.json()['results'] == [], (
+            'Проверьте, что записи моложе `CHANGES_SETTLE_TIME` не '
+            'попадают в ленту.'
+        )
+        response = client.get(self.CHANGES_URL, data={'since': 'broken'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что некорректный курсор отклоняется со статусом 400.'
+        )
+
+        expired = encode_cursor((timezone.now() - timedelta(days=31), 0, 0))
+        response = client.get(self.CHANGES_URL, data={'since': expired})
+        assert response.status_code == HTTPStatus.GONE, (
+            'Проверьте, что курсор старше срока хранения отметок об '
+            'удалении отклоняется со статусом 410.'
+        )
+
+    def test_04_prune_tombstones(self, admin_client):
+        _, categories, _ = create_titles(admin_client)
+        admin_client.delete(f'/api/v1/categories/{categories[1]["slug"]}/')
+        assert Tombstone.objects.count() == 1
+        Tombstone.objects.update(
+            deleted_at=timezone.now() - timedelta(days=40)
+        )
+        call_command('prune_tombstones')
+        assert not Tombstone.objects.exists()
+
+    def test_05_recomputed_rating_reaches_feed(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        _, cursor = self.read_feed(client)
+        title_id = titles[0]['id']
+        Title.objects.filter(pk=title_id).update(score_sum=5, score_count=1)
+
+        call_command('recompute_ratings')
+        changes, _ = self.read_feed(client, cursor)
+        assert [(change['type'], change['id']) for change in changes] == [
+            ('title', title_id)
+        ], (
+            'Проверьте, что пересчёт рейтингов обновляет `updated_at` '
+            'исправленных произведений.'
+        )
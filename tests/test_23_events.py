@@ -0,0 +1,186 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import sync_to_async
+
+from api.events import Broker, get_broker, publish_title_event
+from api_yamdb.asgi import application
+from reviews.models import Comment, Review
+from tests.utils import create_titles
+
+
+class ASGIConnection:
+    """Подключение к ASGI-приложению, которое клиент закрывает сам."""
+
+    def __init__(self, path, method='GET', **scope):
+        self.scope = {
+            'type': 'http',
+            'method': method,
+            'path': path,
+            'query_string': b'',
+            'headers': [(b'host', b'testserver')],
+            **scope,
+        }
+        self.messages = []
+        self.disconnected = asyncio.Event()
+        self.task = asyncio.ensure_future(
+            application(self.scope, self.receive, self.send)
+        )
+
+    async def receive(self):
+        await self.disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        self.messages.append(message)
+
+    async def wait_for(self, predicate, timeout=5):
+        async def poll():
+            while not predicate(self.messages):
+                await asyncio.sleep(0.01)
+        await asyncio.wait_for(poll(), timeout)
+
+    async def close(self):
+        self.disconnected.set()
+        await asyncio.wait_for(self.task, 5)
+
+    @property
+    def body(self):
+        return b''.join(
+            message.get('body', b'') for message in self.messages
+            if message['type'] == 'http.response.body'
+        )
+
+
+def get_events(body):
+    events = []
+    for block in body.decode().split('\n\n'):
+        lines = dict(
+            line.split(': ', 1) for line in block.split('\n')
+            if line.startswith(('event: ', 'data: '))
+        )
+        if 'event' in lines:
+            events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23TitleEvents:
+
+    EVENTS_URL_TEMPLATE = '/api/v1/titles/{title_id}/events/'
+
+    def test_01_stream_receives_reviews_and_comments(self, admin_client,
+                                                     admin, user):
+        titles, _, _ = create_titles(admin_client)
+        title_id, other_title_id = titles[0]['id'], titles[1]['id']
+
+        def write_activity():
+            Review.objects.create(
+                title_id=other_title_id, author=admin, score=3, text='Чужой'
+            )
+            review = Review.objects.create(
+                title_id=title_id, author=user, score=8, text='Отзыв'
+            )
+            Comment.objects.create(
+                review=review, author=admin, text='Комментарий'
+            )
+            return review
+
+        async def scenario():
+            connection = ASGIConnection(
+                self.EVENTS_URL_TEMPLATE.format(title_id=title_id)
+            )
+            await connection.wait_for(lambda messages: len(messages) >= 2)
+            start = connection.messages[0]
+            assert start['status'] == 200
+            assert (b'content-type', b'text/event-stream') in start['headers']
+
+            review = await sync_to_async(write_activity)()
+            await connection.wait_for(
+                lambda messages: b'event: comment' in connection.body
+            )
+            await connection.close()
+            return review, get_events(connection.body)
+
+        review, events = asyncio.run(scenario())
+        assert [event for event, _ in events] == ['review', 'comment'], (
+            'Проверьте, что поток произведения получает только его новые '
+            'отзывы и комментарии.'
+        )
+        assert events[0][1]['id'] == review.pk
+        assert events[0][1]['author'] == user.username
+        assert events[1][1]['review'] == review.pk
+        assert not get_broker().channels, (
+            'Проверьте, что после отключения клиента подписка удаляется.'
+        )
+
+    def test_02_stream_for_missing_title(self, settings):
+        async def scenario():
+            connection = ASGIConnection(
+                self.EVENTS_URL_TEMPLATE.format(title_id=1000)
+            )
+            await asyncio.wait_for(connection.task, 5)
+            return connection.messages[0]['status']
+
+        assert asyncio.run(scenario()) == 404
+
+    def test_03_slow_subscriber_keeps_latest_events(self, settings):
+        settings.EVENTS_QUEUE_SIZE = 2
+        broker = get_broker()
+
+        async def scenario():
+            subscription = broker.subscribe('title:1')
+            for idx in range(5):
+                broker.publish('title:1', idx)
+            await asyncio.sleep(0)
+            received = [await subscription.get(), await subscription.get()]
+            subscription.close()
+            return received
+
+        assert asyncio.run(scenario()) == [3, 4]
+        assert 'title:1' not in broker.channels
+
+    def test_04_root_path_and_host(self, admin_client, settings):
+        titles, _, _ = create_titles(admin_client)
+        url = self.EVENTS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        settings.ALLOWED_HOSTS = ['testserver']
+
+        async def status(connection):
+            await connection.wait_for(lambda messages: messages)
+            await connection.close()
+            return connection.messages[0]['status']
+
+        async def scenario():
+            return [
+                await status(ASGIConnection(
+                    '/prefix' + url, root_path='/prefix'
+                )),
+                await status(ASGIConnection(
+                    url, headers=[(b'host', b'evil.example')]
+                )),
+            ]
+
+        assert asyncio.run(scenario()) == [200, 400], (
+            'Проверьте, что поток событий учитывает `root_path` и '
+            'проверяет заголовок Host по `ALLOWED_HOSTS`.'
+        )
+
+    def test_05_no_subscribers_skips_serialization(self):
+        def get_data():
+            raise AssertionError(
+                'Проверьте, что событие без подписчиков не сериализуется.'
+            )
+
+        publish_title_event(1, 'review', get_data)
+
+    def test_06_broker_interface(self):
+        class PublishOnlyBroker(Broker):
+            def publish(self, channel, message):
+                pass
+
+        with pytest.raises(TypeError, match='subscribe'):
+            PublishOnlyBroker()
+        assert isinstance(get_broker(), Broker), (
+            'Проверьте, что брокер событий реализует интерфейс `Broker`.'
+        )
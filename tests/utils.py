@@ -1,5 +1,8 @@
 from http import HTTPStatus
 
+from django.contrib.auth.tokens import default_token_generator
+from rest_framework.test import APIClient
+
 
 check_name_and_slug_patterns = (
     (
@@ -305,3 +308,22 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def get_token_client(client, user):
+    response = client.post(
+        '/api/v1/auth/token/',
+        data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user)
+        }
+    )
+    assert response.status_code == HTTPStatus.OK, (
+        'Проверьте, что `/api/v1/auth/token/` выдаёт токен для '
+        'корректного кода подтверждения.'
+    )
+    token_client = APIClient()
+    token_client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}'
+    )
+    return token_client